@@ -0,0 +1,151 @@
+"""Exit registration throughput on a single hot product.
+
+Compares the old read-check-insert path with the atomic conditional
+decrement used by register_exit_by_id_service, for 1 and N concurrent
+writers. The mixed run interleaves entries with atomic exits; its final
+stock must match the expected one, or a writer lost another's update.
+It creates a throwaway company and product and removes them at the end.
+
+    python benchmarks/exit_contention.py --writers 1 64 --exits 2000
+"""
+import argparse
+import asyncio
+from http import HTTPStatus
+from time import perf_counter
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from ssmai_backend.models.produto import (
+    Empresa,
+    Estoque,
+    MovimentacoesEstoque,
+    Produto,
+)
+from ssmai_backend.schemas.stock_schemas import EntryModel, ExitModel
+from ssmai_backend.services.stock_service import (
+    register_entry_by_id_service,
+    register_exit_by_id_service,
+)
+from ssmai_backend.settings import Settings
+
+
+async def legacy_exit(session, product_id, quantidade, current_user):
+    stock_db = await session.scalar(
+        select(Estoque).where(Estoque.id_produtos == product_id)
+    )
+    if stock_db.quantidade_disponivel < quantidade:
+        raise HTTPException(HTTPStatus.BAD_REQUEST, 'Quantity unavailable')
+    session.add(MovimentacoesEstoque(
+        id_produtos=product_id,
+        id_empresas=current_user.id_empresas,
+        tipo='Saida',
+        quantidade=quantidade,
+        preco_und=stock_db.custo_medio,
+        total=stock_db.custo_medio * quantidade,
+    ))
+    await session.commit()
+
+
+async def atomic_exit(session, product_id, quantidade, current_user):
+    await register_exit_by_id_service(
+        product_id, session, ExitModel(quantidade=quantidade), current_user
+    )
+
+
+async def entry(session, product_id, quantidade, current_user):
+    await register_entry_by_id_service(
+        product_id, session,
+        EntryModel(quantidade=quantidade, preco_und=10.0), current_user
+    )
+
+
+async def setup(engine, stock):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        empresa = Empresa(nome=f'benchmark-{uuid4()}', ramo='benchmark')
+        session.add(empresa)
+        await session.flush()
+        produto = Produto(
+            nome='benchmark', categoria='benchmark',
+            id_empresas=empresa.id
+        )
+        session.add(produto)
+        await session.flush()
+        session.add(Estoque(
+            id_produtos=produto.id, id_empresas=empresa.id,
+            quantidade_disponivel=stock, custo_medio=10.0
+        ))
+        await session.commit()
+        return empresa.id, produto.id
+
+
+async def run(engine, operations, writers, exits, stock):
+    empresa_id, product_id = await setup(engine, stock)
+    current_user = SimpleNamespace(id_empresas=empresa_id)
+    pending = iter(range(exits))
+    accepted = 0
+    entries = 0
+
+    async def writer():
+        nonlocal accepted, entries
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            for i in pending:
+                operation = operations[i % len(operations)]
+                try:
+                    await operation(session, product_id, 1, current_user)
+                except HTTPException:
+                    await session.rollback()
+                else:
+                    if operation is entry:
+                        entries += 1
+                    else:
+                        accepted += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(writer() for _ in range(writers)))
+    elapsed = perf_counter() - start
+
+    async with AsyncSession(engine) as session:
+        final = await session.scalar(
+            select(Estoque.quantidade_disponivel)
+            .where(Estoque.id_produtos == product_id)
+        )
+        await session.execute(
+            text('DELETE FROM empresas WHERE id = :id'), {'id': empresa_id}
+        )
+        await session.commit()
+    return exits / elapsed, accepted, final, stock + entries - accepted
+
+
+async def main(args):
+    engine = create_async_engine(
+        Settings().DATABASE_URL, pool_size=max(args.writers)
+    )
+    # Estoque menor que o total de saídas: sobra para detectar venda a mais
+    stock = args.stock if args.stock is not None else args.exits // 2
+    print(f'{args.exits} moviments of 1 unit against {stock} in stock')
+    print(f"{'path':<8}{'writers':>8}{'ops/s':>10}"
+          f"{'accepted':>10}{'final':>8}{'expected':>10}")
+    for name, operations in (
+        ('legacy', (legacy_exit,)),
+        ('atomic', (atomic_exit,)),
+        ('mixed', (atomic_exit, entry)),
+    ):
+        for writers in args.writers:
+            throughput, accepted, final, expected = await run(
+                engine, operations, writers, args.exits, stock
+            )
+            print(f'{name:<8}{writers:>8}{throughput:>10.0f}'
+                  f'{accepted:>10}{final:>8}{expected:>10}')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 64])
+    parser.add_argument('--exits', type=int, default=2000)
+    parser.add_argument('--stock', type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
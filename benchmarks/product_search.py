@@ -0,0 +1,132 @@
+"""Latency of search_products_service in prefix and fuzzy mode.
+
+Seeds throwaway companies with generated product names, then times the
+service for user-typed prefixes and misspelled words against one of them.
+Fuzzy mode needs pg_trgm and the ix_produtos_busca_trgm index from the
+migrations. The companies and their products are removed at the end.
+
+    python benchmarks/product_search.py --companies 20 --products 10000
+"""
+import argparse
+import asyncio
+import random
+from statistics import median, quantiles
+from time import perf_counter
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from ssmai_backend.enums.products_enums import ProductSearchModeEnum
+from ssmai_backend.models.produto import Empresa, Produto
+from ssmai_backend.services.products_service import search_products_service
+from ssmai_backend.settings import Settings
+
+WORDS = (
+    'parafuso porca arruela martelo chave fenda alicate serra broca '
+    'furadeira lixa tinta pincel rolo cimento areia tijolo telha cano '
+    'joelho registro torneira mangueira fita cola prego grampo trena '
+    'nivel esquadro'
+).split()
+CATEGORIES = (
+    'Ferragens', 'Ferramentas', 'Pintura', 'Hidráulica', 'Construção',
+    'Elétrica', 'Jardim', 'Fixação',
+)
+WARMUP = 50
+
+
+def misspell(word, rnd):
+    i = rnd.randrange(len(word))
+    return word[:i] + rnd.choice('aeiourst') + word[i + 1:]
+
+
+async def setup(engine, companies, products, rnd):
+    tag = f'benchmark-{uuid4()}'
+    async with AsyncSession(engine) as session:
+        await session.execute(insert(Empresa), [
+            {'nome': f'{tag}-{i}', 'ramo': 'benchmark'}
+            for i in range(companies)
+        ])
+        empresa_ids = (await session.scalars(
+            select(Empresa.id).where(Empresa.nome.startswith(tag))
+        )).all()
+        await session.execute(insert(Produto), [
+            {
+                'id_empresas': empresa_id,
+                'nome': f'{rnd.choice(WORDS).capitalize()} '
+                        f'{rnd.choice(WORDS)} {i}',
+                'categoria': rnd.choice(CATEGORIES),
+            }
+            for empresa_id in empresa_ids
+            for i in range(products)
+        ])
+        await session.commit()
+    # Sem o VACUUM a primeira leitura ainda grava hint bits e distorce o p95
+    autocommit = engine.execution_options(isolation_level='AUTOCOMMIT')
+    async with autocommit.connect() as conn:
+        await conn.execute(text('VACUUM ANALYZE produtos'))
+    return empresa_ids
+
+
+async def run(engine, mode, queries, limit, current_user):
+    timings = []
+    rows = 0
+    async with AsyncSession(engine) as session:
+        for q in queries[:WARMUP]:
+            await search_products_service(
+                q, mode, limit, session, current_user
+            )
+        for q in queries:
+            start = perf_counter()
+            result = await search_products_service(
+                q, mode, limit, session, current_user
+            )
+            timings.append((perf_counter() - start) * 1000)
+            rows += len(result)
+    p95 = quantiles(timings, n=20)[-1]
+    return median(timings), p95, max(timings), rows / len(queries)
+
+
+async def main(args):
+    engine = create_async_engine(Settings().DATABASE_URL)
+    rnd = random.Random(args.seed)
+    empresa_ids = await setup(engine, args.companies, args.products, rnd)
+    current_user = SimpleNamespace(id_empresas=empresa_ids[0])
+    queries = {
+        ProductSearchModeEnum.prefix: [
+            rnd.choice(WORDS)[:rnd.randint(2, 6)]
+            for _ in range(args.queries)
+        ],
+        ProductSearchModeEnum.fuzzy: [
+            misspell(rnd.choice(WORDS), rnd) for _ in range(args.queries)
+        ],
+    }
+    print(f'{args.companies} companies x {args.products} products, '
+          f'{args.queries} queries per mode, limit {args.limit}')
+    print(f"{'mode':<8}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'max ms':>10}{'rows':>8}")
+    try:
+        for mode, mode_queries in queries.items():
+            p50, p95, worst, rows = await run(
+                engine, mode, mode_queries, args.limit, current_user
+            )
+            print(f'{mode.value:<8}{p50:>10.2f}{p95:>10.2f}'
+                  f'{worst:>10.2f}{rows:>8.1f}')
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                delete(Empresa).where(Empresa.id.in_(empresa_ids))
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--companies', type=int, default=20)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=400)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
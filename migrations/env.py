@@ -31,6 +31,20 @@ target_metadata = table_registry.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Partições mensais são criadas por fn_criar_particoes_movimentacoes
+    if type_ == "table" and reflected and name.startswith("movimentacoes_estoque_"):
+        return False
+    # Índices de expressão: o autogenerate não sabe compará-los, e o de
+    # trigram depende de pg_trgm/btree_gin, existindo só pela migration
+    if type_ == "index" and name in {
+        "ix_produtos_busca_trgm",
+        "ix_produtos_empresa_nome_prefixo",
+    }:
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -47,6 +61,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -56,7 +71,9 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection):
     context.configure(
-        connection=connection, target_metadata=target_metadata
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -14,6 +14,22 @@ from ssmai_backend.schemas.users_schemas import (
     UserSchema,
 )
 from ssmai_backend.security.user_settings import auth_backend
+from ssmai_backend.services.forecast_engine import (
+    shutdown_forecast_executor,
+    warm_up_forecast_executor,
+)
+from ssmai_backend.services.forecast_jobs_service import (
+    start_forecast_job_workers,
+    stop_forecast_job_workers,
+)
+from ssmai_backend.services.partitions_service import (
+    start_partitions_maintenance,
+    stop_partitions_maintenance,
+)
+from ssmai_backend.services.stock_snapshots_service import (
+    start_stock_snapshots,
+    stop_stock_snapshots,
+)
 from ssmai_backend.mcp.client import MCPClient
 from pydantic import BaseModel, Field
 from typing import Optional
@@ -148,11 +164,25 @@ async def startup_event():
         logger.info("🔄 Application will continue without MCP connection")
         mcp_container.client = None
 
+
+@app.on_event("startup")
+async def startup_forecast_workers():
+    """Spawn the forecast process pool so Prophet/Stan are already loaded"""
+    warm_up_forecast_executor()
+    start_forecast_job_workers()
+    start_partitions_maintenance()
+    start_stock_snapshots()
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     if mcp_container.client:
         await mcp_container.client.cleanup()
+    await stop_forecast_job_workers()
+    await stop_partitions_maintenance()
+    await stop_stock_snapshots()
+    shutdown_forecast_executor()
 
 app.include_router(products.router)
 app.include_router(router)
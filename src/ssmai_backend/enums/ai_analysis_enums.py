@@ -0,0 +1,18 @@
+from enum import Enum
+
+
+class ForecastEngineEnum(str, Enum):
+    prophet = 'prophet'
+    croston = 'croston'
+
+
+class ForecastJobStatusEnum(str, Enum):
+    queued = 'queued'
+    running = 'running'
+    done = 'done'
+    failed = 'failed'
+
+
+class GraphCacheBackendEnum(str, Enum):
+    memory = 'memory'
+    postgres = 'postgres'
@@ -5,3 +5,24 @@ class MovementTypesEnum(str, Enum):
     entrada = 'Entrada'
     saida = 'Saida'
     outro = 'Outro'
+
+
+class ExportFormatEnum(str, Enum):
+    csv = 'csv'
+    parquet = 'parquet'
+
+
+class ExportDatasetEnum(str, Enum):
+    moviments = 'moviments'
+    stock = 'stock'
+
+
+class ProductSearchModeEnum(str, Enum):
+    fuzzy = 'fuzzy'
+    prefix = 'prefix'
+
+
+class StockStatusEnum(str, Enum):
+    sem_estoque = 'sem_estoque'
+    abaixo_do_ideal = 'abaixo_do_ideal'
+    acima_do_ideal = 'acima_do_ideal'
@@ -68,7 +68,8 @@ class MCPClient:
 
         Para querys que tragam muitas informações, foque em fazer uma soma total, exemplo:
         Pergunta: "Quantas movimentações tivemos hoje?"
-        Ação: Use query_database diretamente com a data atual fornecida: "SELECT * FROM movimentacoes_estoque me JOIN produtos p ON me.id_produtos = p.id WHERE p.id_empresas = X AND DATE(me.date) = 'YYYY-MM-DD' LIMIT 5"
+        Ação: Use query_database diretamente com a data atual fornecida: "SELECT * FROM movimentacoes_estoque me JOIN produtos p ON me.id_produtos = p.id WHERE p.id_empresas = X AND me.date >= 'YYYY-MM-DD' AND me.date < 'YYYY-MM-DD (dia seguinte)' LIMIT 5"
+        Filtre datas sempre por intervalo na coluna (me.date >= início AND me.date < fim), nunca com DATE(me.date), para aproveitar as partições mensais.
         Se a quantidade retornar 5 registros, avisa que possívelmente há mais registros, mas que você está limitada a mostrar 5. 
         Isso vale para qualquer outra query que possa retornar múltiplos registros.
         
@@ -476,8 +477,9 @@ Principais tabelas: {main_tables_str}"""
         """Process user query using Claude 3.5 Haiku with company filtering"""
         try:
             
-            from datetime import datetime
+            from datetime import datetime, timedelta
             current_date = datetime.now().strftime('%Y-%m-%d')
+            next_date = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
             current_datetime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
             
@@ -489,7 +491,8 @@ Principais tabelas: {main_tables_str}"""
             - Para produtos: SELECT * FROM produtos WHERE id_empresas = {company_id}
             - Para estoque: SELECT e.*, p.nome FROM estoque e JOIN produtos p ON e.id_produtos = p.id WHERE p.id_empresas = {company_id}
             - Para movimentações: SELECT me.*, p.nome FROM movimentacoes_estoque me JOIN produtos p ON me.id_produtos = p.id WHERE p.id_empresas = {company_id}
-            - Para movimentações de HOJE ({current_date}): WHERE p.id_empresas = {company_id} AND DATE(me.date) = '{current_date}'
+            - Para movimentações de HOJE ({current_date}): WHERE p.id_empresas = {company_id} AND me.date >= '{current_date}' AND me.date < '{next_date}'
+            - Para buscar produto por nome: WHERE id_empresas = {company_id} AND (nome %> 'termo' OR categoria %> 'termo') ORDER BY word_similarity('termo', nome) DESC (usa o índice trigram; não use ILIKE '%termo%')
             
             EXECUTE SEMPRE:
             1. Use query_database para TODA pergunta sobre dados
@@ -556,7 +559,7 @@ Principais tabelas: {main_tables_str}"""
                             "type": "tool_use", 
                             "id": "example_2",
                             "name": "query_database",
-                            "input": {"query": f"SELECT me.tipo, me.quantidade, p.nome, me.date FROM movimentacoes_estoque me JOIN produtos p ON me.id_produtos = p.id WHERE p.id_empresas = 1 AND DATE(me.date) = '{current_date}'"}
+                            "input": {"query": f"SELECT me.tipo, me.quantidade, p.nome, me.date FROM movimentacoes_estoque me JOIN produtos p ON me.id_produtos = p.id WHERE p.id_empresas = 1 AND me.date >= '{current_date}' AND me.date < '{next_date}'"}
                         }
                     ]
                 },
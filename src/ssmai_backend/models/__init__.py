@@ -1,4 +1,5 @@
 from .chat_conversation import ChatConversation as ChatConversation
 from .document import Document as Document
+from .forecast_job import ForecastJob as ForecastJob
 from .produto import Produto as Produto
 from .user import User as User
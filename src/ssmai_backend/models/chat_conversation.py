@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, Integer, Text, String, func
+from sqlalchemy import ForeignKey, Index, Integer, Text, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ssmai_backend.models.produto import table_registry
@@ -11,6 +11,9 @@ from ssmai_backend.models.produto import table_registry
 class ChatConversation:
     """Model for storing chat conversations by user"""
     __tablename__ = "chat_conversations"
+    __table_args__ = (
+        Index('ix_chat_conversations_user_created', 'user_id', 'created_at'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -13,7 +13,8 @@ class Document:
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     id_empresas: Mapped[int] = mapped_column(
         ForeignKey('empresas.id', ondelete='CASCADE', name="fk_documentos_empresas"),
-        nullable=False
+        nullable=False,
+        index=True
     )
     extracted: Mapped[bool]
     document_path: Mapped[str]
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import ForeignKey, Index, Integer, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ssmai_backend.enums.ai_analysis_enums import (
+    ForecastEngineEnum,
+    ForecastJobStatusEnum,
+)
+from ssmai_backend.models.produto import table_registry
+
+
+@table_registry.mapped_as_dataclass
+class ForecastJob:
+    """Queued tenant-wide forecast refresh, drained by the job workers"""
+    __tablename__ = "previsoes_jobs"
+    __table_args__ = (
+        # Só um job ativo por empresa: pedidos repetidos reaproveitam o job
+        Index(
+            'ux_previsoes_jobs_empresa_ativo',
+            'id_empresas',
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
+    id_empresas: Mapped[int] = mapped_column(
+        ForeignKey(
+            'empresas.id',
+            ondelete='CASCADE',
+            name="fk_previsoes_jobs_empresas",
+        ),
+        nullable=False
+    )
+    status: Mapped[ForecastJobStatusEnum] = mapped_column(
+        nullable=False, default=ForecastJobStatusEnum.queued
+    )
+    engine: Mapped[Optional[ForecastEngineEnum]] = mapped_column(
+        nullable=True, default=None
+    )
+    force: Mapped[bool] = mapped_column(nullable=False, default=False)
+    total: Mapped[int] = mapped_column(nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(nullable=False, default=0)
+    refreshed: Mapped[int] = mapped_column(nullable=False, default=0)
+    skipped: Mapped[int] = mapped_column(nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(nullable=False, default=0)
+    errors: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, default_factory=dict
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        nullable=False, init=False, server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True, init=False, default=None
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True, init=False, default=None
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        nullable=False, init=False, onupdate=func.now(),
+        server_default=func.now()
+    )
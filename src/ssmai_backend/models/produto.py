@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DDL, Computed, ForeignKey, Index, event, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, registry
 
 from ssmai_backend.enums.products_enums import MovementTypesEnum
@@ -11,10 +12,35 @@ table_registry = registry()
 @table_registry.mapped_as_dataclass
 class Produto:
     __tablename__ = "produtos"
+    __table_args__ = (
+        Index('ix_produtos_empresa_nome', 'id_empresas', 'nome', unique=True),
+        # Paginação por cursor (created_at, id) dentro da empresa
+        Index(
+            'ix_produtos_empresa_criacao', 'id_empresas', 'created_at', 'id'
+        ),
+        # Busca aproximada por trigram, já filtrada pela empresa (btree_gin)
+        Index(
+            'ix_produtos_busca_trgm',
+            'id_empresas', 'nome', 'categoria',
+            postgresql_using='gin',
+            postgresql_ops={
+                'nome': 'gin_trgm_ops',
+                'categoria': 'gin_trgm_ops',
+            },
+        ),
+        # Busca por prefixo: LIKE e ORDER BY no mesmo índice (collation C)
+        Index(
+            'ix_produtos_empresa_nome_prefixo',
+            'id_empresas',
+            text('lower(nome) COLLATE "C"'),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, init=False)
     id_empresas: Mapped[int] = mapped_column(
-        ForeignKey('empresas.id', ondelete='CASCADE', name="fk_produtos_empresas"),
+        ForeignKey(
+            'empresas.id', ondelete='CASCADE', name="fk_produtos_empresas"
+        ),
         nullable=False
     )
     nome: Mapped[str]
@@ -31,14 +57,46 @@ class Produto:
 @table_registry.mapped_as_dataclass
 class Estoque:
     __tablename__ = "estoque"
+    __table_args__ = (
+        Index(
+            'ix_estoque_empresa_desvio',
+            'id_empresas',
+            text('abs_difference_percent DESC'),
+            'id',
+            postgresql_where=text('estoque_ideal IS NOT NULL'),
+        ),
+        Index('ix_estoque_id_produtos', 'id_produtos'),
+        Index('ix_estoque_id_empresas', 'id_empresas'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, init=False)
     id_produtos: Mapped[int] = mapped_column(
         ForeignKey('produtos.id', ondelete='CASCADE'), nullable=False
     )
+    id_empresas: Mapped[int] = mapped_column(
+        ForeignKey(
+            'empresas.id', ondelete='CASCADE', name="fk_estoque_empresas"
+        ),
+        nullable=False
+    )
     quantidade_disponivel: Mapped[int]
     custo_medio: Mapped[float] = mapped_column(nullable=False)
     estoque_ideal: Mapped[float] = mapped_column(nullable=True, init=False)
+    # Desvio em relação ao estoque ideal, mantido pelo próprio Postgres
+    abs_difference_percent: Mapped[float] = mapped_column(
+        Computed(
+            "CASE "
+            "WHEN estoque_ideal = 0 AND quantidade_disponivel > 0 "
+            "THEN 9999999.0 "
+            "WHEN estoque_ideal = 0 THEN 0.0 "
+            "ELSE abs((quantidade_disponivel - estoque_ideal) "
+            "/ estoque_ideal) * 100.0 "
+            "END",
+            persisted=True,
+        ),
+        nullable=True,
+        init=False,
+    )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -50,18 +108,115 @@ class Estoque:
 @table_registry.mapped_as_dataclass
 class MovimentacoesEstoque:
     __tablename__ = "movimentacoes_estoque"
+    __table_args__ = (
+        # Paginação por cursor (date, id), da mais recente para a mais antiga
+        Index(
+            'ix_movimentacoes_estoque_produto_data',
+            'id_produtos', 'date', 'id',
+        ),
+        Index('ix_movimentacoes_estoque_data', 'date', 'id'),
+        # Cursor por empresa sem passar pelas movimentações das outras
+        Index(
+            'ix_movimentacoes_estoque_empresa_data',
+            'id_empresas', 'date', 'id',
+        ),
+        # Particionada por mês; as próximas partições são criadas por
+        # fn_criar_particoes_movimentacoes
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, init=False)
-    id_produtos: Mapped[int] = mapped_column(
-        ForeignKey('produtos.id', ondelete='CASCADE'), nullable=False
+    id: Mapped[int] = mapped_column(
+        primary_key=True, autoincrement=True, init=False
     )
+    # Sem FK: a checagem por linha pesava nas cargas; a remoção em cascata
+    # fica com tr_produtos_remover_movimentacoes
+    id_produtos: Mapped[int] = mapped_column(nullable=False)
+    # Cópia de produtos.id_empresas, também sem FK
+    id_empresas: Mapped[int] = mapped_column(nullable=False)
     tipo: Mapped[MovementTypesEnum] = mapped_column(nullable=False)
     quantidade: Mapped[int] = mapped_column(nullable=False)
     preco_und: Mapped[float] = mapped_column(nullable=False)
     total: Mapped[float] = mapped_column(nullable=False)
     date: Mapped[datetime] = mapped_column(
+        primary_key=True, init=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(onupdate=func.now(),
         init=False, server_default=func.now()
     )
+
+
+# Operadores do ix_produtos_busca_trgm; as migrations criam o mesmo
+event.listen(
+    Produto.__table__,
+    'before_create',
+    DDL(
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+        "CREATE EXTENSION IF NOT EXISTS btree_gin"
+    ),
+)
+
+
+# Sem partição default a tabela criada via metadata não aceitaria inserts
+event.listen(
+    MovimentacoesEstoque.__table__,
+    'after_create',
+    DDL(
+        "CREATE TABLE movimentacoes_estoque_default "
+        "PARTITION OF movimentacoes_estoque DEFAULT"
+    ),
+)
+
+
+# Faz o papel do ON DELETE CASCADE que as movimentações não têm mais
+event.listen(
+    Produto.__table__,
+    'after_create',
+    DDL(
+        "CREATE OR REPLACE FUNCTION fn_remover_movimentacoes_produtos() "
+        "RETURNS TRIGGER AS $$ BEGIN "
+        "DELETE FROM movimentacoes_estoque m USING removidos r "
+        "WHERE m.id_produtos = r.id; "
+        "RETURN NULL; "
+        "END; $$ LANGUAGE plpgsql; "
+        "CREATE TRIGGER tr_produtos_remover_movimentacoes "
+        "AFTER DELETE ON produtos REFERENCING OLD TABLE AS removidos "
+        "FOR EACH STATEMENT "
+        "EXECUTE FUNCTION fn_remover_movimentacoes_produtos()"
+    ),
+)
+
+
+@table_registry.mapped_as_dataclass
+class MovimentacoesDiarias:
+    __tablename__ = "movimentacoes_diarias"
+
+    id_produtos: Mapped[int] = mapped_column(
+        ForeignKey('produtos.id', ondelete='CASCADE'), primary_key=True
+    )
+    data: Mapped[date] = mapped_column(primary_key=True)
+    quantidade_entrada: Mapped[int] = mapped_column(nullable=False)
+    quantidade_saida: Mapped[int] = mapped_column(nullable=False)
+    valor_total: Mapped[float] = mapped_column(nullable=False)
+    soma_preco_und: Mapped[float] = mapped_column(nullable=False)
+    total_movimentacoes: Mapped[int] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(onupdate=func.now(),
+        init=False, server_default=func.now()
+    )
+
+
+@table_registry.mapped_as_dataclass
+class MovimentacoesResumo:
+    """Per-product movement totals kept by tr_movimentacoes_resumo"""
+
+    __tablename__ = "movimentacoes_resumo"
+
+    id_produtos: Mapped[int] = mapped_column(
+        ForeignKey('produtos.id', ondelete='CASCADE'), primary_key=True
+    )
+    ultima_movimentacao_id: Mapped[int] = mapped_column(nullable=False)
+    ultima_movimentacao_em: Mapped[datetime] = mapped_column(nullable=False)
+    total_movimentacoes: Mapped[int] = mapped_column(nullable=False)
+    soma_quantidade: Mapped[int] = mapped_column(nullable=False)
     updated_at: Mapped[datetime] = mapped_column(onupdate=func.now(),
         init=False, server_default=func.now()
     )
@@ -85,6 +240,9 @@ class Empresa:
 @table_registry.mapped_as_dataclass
 class Previsoes:
     __tablename__ = "previsoes"
+    __table_args__ = (
+        Index('ix_previsoes_produto_data', 'id_produtos', 'data'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, init=False)
     id_produtos: Mapped[int] = mapped_column(
@@ -100,3 +258,45 @@ class Previsoes:
     updated_at: Mapped[datetime] = mapped_column(onupdate=func.now(),
         init=False, server_default=func.now()
     )
+
+
+@table_registry.mapped_as_dataclass
+class PrevisoesFingerprint:
+    __tablename__ = "previsoes_fingerprints"
+
+    id_produtos: Mapped[int] = mapped_column(
+        ForeignKey('produtos.id', ondelete='CASCADE'), primary_key=True
+    )
+    ultima_movimentacao_id: Mapped[int] = mapped_column(nullable=False)
+    ultima_movimentacao_em: Mapped[datetime] = mapped_column(nullable=False)
+    total_movimentacoes: Mapped[int] = mapped_column(nullable=False)
+    soma_quantidade: Mapped[int] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(onupdate=func.now(),
+        init=False, server_default=func.now()
+    )
+
+
+@table_registry.mapped_as_dataclass
+class PrevisoesGraficoCache:
+    __tablename__ = "previsoes_graficos_cache"
+    # Cache descartável: UNLOGGED evita WAL e o conteúdo pode sumir num crash
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    id_produtos: Mapped[int] = mapped_column(
+        ForeignKey('produtos.id', ondelete='CASCADE'), primary_key=True
+    )
+    versao: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(nullable=False)
+
+
+@table_registry.mapped_as_dataclass
+class EstoqueSnapshot:
+    __tablename__ = "estoque_snapshots"
+
+    id_produtos: Mapped[int] = mapped_column(
+        ForeignKey('produtos.id', ondelete='CASCADE'), primary_key=True
+    )
+    capturado_em: Mapped[datetime] = mapped_column(primary_key=True)
+    quantidade_disponivel: Mapped[int] = mapped_column(nullable=False)
+    custo_medio: Mapped[float] = mapped_column(nullable=False)
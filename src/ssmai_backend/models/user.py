@@ -14,7 +14,8 @@ class User(SQLAlchemyBaseUserTable[int]):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     id_empresas: Mapped[int] = mapped_column(
         ForeignKey('empresas.id', ondelete='CASCADE', name="fk_usuarios_empresas"),
-        nullable=False
+        nullable=False,
+        index=True
     )
     username: Mapped[str] = mapped_column(nullable=False, unique=True)
     name: Mapped[str] = mapped_column(nullable=False)
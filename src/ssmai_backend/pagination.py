@@ -0,0 +1,68 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from http import HTTPStatus
+from json import dumps, loads
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ssmai_backend.schemas.root_schemas import CursorPage
+
+
+def encode_cursor(date: datetime, id: int) -> str:
+    token = dumps([date.isoformat(), id]).encode()
+    return urlsafe_b64encode(token).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        date, id = loads(urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(date), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def paginate_by_keyset(  # noqa: PLR0913
+    session: AsyncSession,
+    statement: Select,
+    date_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    page: CursorPage,
+    *,
+    rows: bool = False,
+):
+    """Newest-first page over ``(date, id)``.
+
+    Seeks straight to the cursor through the composite index instead of
+    skipping rows, so every page costs the same. Returns the page and the
+    token for the next one, or ``None`` on the last page. With ``rows``
+    the page holds the selected row tuples instead of ORM instances.
+    """
+    if page.cursor:
+        cursor_date, cursor_id = decode_cursor(page.cursor)
+        statement = statement.where(
+            # Redundante com a tupla, mas permite o pruning de partições
+            date_column <= cursor_date,
+            tuple_(date_column, id_column) < (cursor_date, cursor_id)
+        )
+    result = await session.execute(
+        statement
+        .order_by(date_column.desc(), id_column.desc())
+        .limit(page.limit + 1)
+    )
+    items = result.all() if rows else result.scalars().all()
+
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        last = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last, date_column.key), getattr(last, id_column.key)
+        )
+    return items, next_cursor
@@ -1,24 +1,34 @@
+from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ssmai_backend.database import get_session
+from ssmai_backend.enums.ai_analysis_enums import ForecastEngineEnum
 from ssmai_backend.models.user import User
 from ssmai_backend.routers.users import fastapi_users
 from ssmai_backend.schemas.ai_analysis_schemas import (
     AnalysisSchema,
+    BatchAnalysisSchema,
+    ForecastJobSchema,
     IdealStockSchema,
     PrevisoesResponse,
 )
-from ssmai_backend.schemas.root_schemas import Message
+from ssmai_backend.schemas.root_schemas import FilterPage, Message
 from ssmai_backend.services.ai_analysis_service import (
     get_analysis_by_product_id_service,
+    get_batch_analysis_service,
     get_graph_data_by_product_id_service,
+    get_graph_version_service,
     get_worst_stock_deviation_service,
-    update_ai_predictions_to_enterpryse_service,
     update_by_product_id_service,
 )
+from ssmai_backend.services.forecast_jobs_service import (
+    enqueue_forecast_job_service,
+    get_forecast_job_service,
+)
+from ssmai_backend.services.graph_cache import etag_matches, format_etag
 
 router = APIRouter(prefix="/ai_analysis", tags=["ai_analysis"])
 
@@ -27,13 +37,42 @@ T_CurrentUser = Annotated[User, Depends(fastapi_users.current_user())]
 T_Session = Annotated[AsyncSession, Depends(get_session)]
 
 
-@router.put("/all", response_model=Message)
+@router.put(
+    "/all",
+    status_code=HTTPStatus.ACCEPTED,
+    response_model=ForecastJobSchema,
+)
 async def update_batch(
     current_user: T_CurrentUser,
     session: T_Session,
+    force: bool = False,
+    engine: ForecastEngineEnum | None = None,
+):
+    return await enqueue_forecast_job_service(
+        current_user, session, force, engine
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=ForecastJobSchema)
+async def get_forecast_job(
+    current_user: T_CurrentUser,
+    session: T_Session,
+    job_id: int,
+):
+    return await get_forecast_job_service(job_id, current_user, session)
+
 
+@router.get("/batch", response_model=list[BatchAnalysisSchema])
+async def get_batch_analysis(
+    current_user: T_CurrentUser,
+    session: T_Session,
+    product_ids: Annotated[list[int] | None, Query()] = None,
+    service_level: float = 0.95,
+    lead_time: int = 7
 ):
-    return await update_ai_predictions_to_enterpryse_service(current_user, session)
+    return await get_batch_analysis_service(
+        current_user, session, product_ids, service_level, lead_time
+    )
 
 
 @router.put("/{product_id}", response_model=Message)
@@ -41,8 +80,11 @@ async def update_by_product_id(
     current_user: T_CurrentUser,
     session: T_Session,
     product_id: int,
+    engine: ForecastEngineEnum | None = None,
 ):
-    return await update_by_product_id_service(current_user, session, product_id)
+    return await update_by_product_id_service(
+        current_user, session, product_id, engine
+    )
 
 
 @router.get("/{product_id}", response_model=AnalysisSchema)
@@ -60,14 +102,29 @@ async def get_analysis_by_product_id(
 async def get_grath_data_by_product_id(
     current_user: T_CurrentUser,
     session: T_Session,
-    product_id: int
+    product_id: int,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    return await get_graph_data_by_product_id_service(product_id, session)
+    version = await get_graph_version_service(product_id, session)
+    if version:
+        if if_none_match and etag_matches(if_none_match, version):
+            return Response(
+                status_code=HTTPStatus.NOT_MODIFIED,
+                headers={"ETag": format_etag(version)}
+            )
+        response.headers["ETag"] = format_etag(version)
+    return await get_graph_data_by_product_id_service(
+        product_id, session, version
+    )
 
 
 @router.get("/worst_stocks/", response_model=list[IdealStockSchema])
 async def get_wors_stocks(
     current_user: T_CurrentUser,
     session: T_Session,
+    filter: Annotated[FilterPage, Query()],
 ):
-    return await get_worst_stock_deviation_service(session, current_user)
+    return await get_worst_stock_deviation_service(
+        session, current_user, filter
+    )
@@ -10,27 +10,43 @@ from ssmai_backend.database import (
     get_session,
     get_textract_client,
 )
+from ssmai_backend.enums.products_enums import (
+    ProductSearchModeEnum,
+    StockStatusEnum,
+)
 from ssmai_backend.models.user import User
 from ssmai_backend.routers.users import fastapi_users
 from ssmai_backend.schemas.products_schemas import (
     ExtractResultSchema,
+    ProductBatchList,
+    ProductImportSummary,
     ProductInfoByAIResponse,
     ProductSchema,
+    ProductSearchList,
     ProductsList,
+    ProductsWithStockList,
+    ProductsWithStockPage,
     PublicProductSchema,
 )
-from ssmai_backend.schemas.root_schemas import FilterPage, Message
+from ssmai_backend.schemas.root_schemas import (
+    CursorPage,
+    FilterPage,
+    Message,
+)
 from ssmai_backend.services.products_service import (
     create_product_by_document_service,
     create_product_by_document_service_fake,
     create_product_service,
+    create_products_service,
     delete_all_products_by_enterpryse_id_service,
     delete_product_by_id_service,
     generate_product_info_from_docs_pre_extracted_service,
     get_all_products_with_analysis_service,
+    get_products_with_stock_service,
     insert_products_with_csv_service,
     read_all_products_by_user_enterpryse_service,
     read_all_products_service,
+    search_products_service,
     update_product_by_id_service,
     update_product_image_service,
 )
@@ -63,6 +79,19 @@ async def create_product(
     return await create_product_service(product, session, current_user)
 
 
+@router.post(
+    "/batch",
+    status_code=HTTPStatus.CREATED,
+    response_model=ProductBatchList,
+)
+async def create_products(
+    products: list[ProductSchema],
+    session: T_Session,
+    current_user: T_CurrentUser,
+):
+    return await create_products_service(products, session, current_user)
+
+
 @router.get("/all_by_user_enterpryse", response_model=ProductsList)
 async def get_all_products_by_current_user(
     session: T_Session,
@@ -143,7 +172,7 @@ async def generate_product_info_from_docs_pre_extracted(
     )
 
 
-@router.post('/insert_batch', response_model=Message, status_code=HTTPStatus.CREATED)
+@router.post('/insert_batch', response_model=ProductImportSummary, status_code=HTTPStatus.CREATED)
 async def insert_products_with_csv(
     session: T_Session,
     current_user: T_CurrentUser,
@@ -181,7 +210,20 @@ async def extract_text_from_document(
     )
 
 
-@router.get("/with_analysis", response_model=ProductsList)
+@router.get("/search", response_model=ProductSearchList)
+async def search_products(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    mode: ProductSearchModeEnum = ProductSearchModeEnum.fuzzy,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    return {"products": await search_products_service(
+        q, mode, limit, session, current_user
+    )}
+
+
+@router.get("/with_analysis", response_model=ProductsWithStockList)
 async def get_all_products_with_analysis(
     session: T_Session,
     filter: Annotated[FilterPage, Query()],
@@ -194,6 +236,19 @@ async def get_all_products_with_analysis(
         )}
 
 
+@router.get("/with_stock", response_model=ProductsWithStockPage)
+async def get_products_with_stock(
+    session: T_Session,
+    page: Annotated[CursorPage, Query()],
+    current_user: T_CurrentUser,
+    categoria: str | None = None,
+    status: StockStatusEnum | None = None,
+):
+    return await get_products_with_stock_service(
+        session, page, categoria, status, current_user
+    )
+
+
 @router.put('/{product_id}/image',
              status_code=HTTPStatus.CREATED,
              response_model=PublicProductSchema)
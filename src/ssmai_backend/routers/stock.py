@@ -1,21 +1,35 @@
+from datetime import date, datetime
 from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ssmai_backend.database import get_session
+from ssmai_backend.enums.products_enums import (
+    ExportDatasetEnum,
+    ExportFormatEnum,
+)
 from ssmai_backend.models.user import User
 from ssmai_backend.routers.users import fastapi_users
-from ssmai_backend.schemas.root_schemas import FilterPage, Message
+from ssmai_backend.schemas.root_schemas import (
+    CursorPage,
+    FilterPage,
+    Message,
+)
 from ssmai_backend.schemas.stock_schemas import (
+    BatchMovimentList,
+    BatchMovimentModel,
     EntryModel,
     ExitModel,
     MovimentList,
     MovimentModelResponse,
+    StockAtDateModel,
     StockList,
     StockModel,
 )
+from ssmai_backend.services.stock_export import export_stock_service
 from ssmai_backend.services.stock_service import (
     get_all_moviments_by_enterpryse_user_service,
     get_all_moviments_service,
@@ -27,6 +41,10 @@ from ssmai_backend.services.stock_service import (
     insert_moviments_with_csv_service,
     register_entry_by_id_service,
     register_exit_by_id_service,
+    register_moviments_batch_service,
+)
+from ssmai_backend.services.stock_snapshots_service import (
+    get_stock_at_date_service,
 )
 
 router = APIRouter(prefix="/stock", tags=["stock"])
@@ -119,6 +137,21 @@ async def register_exit_by_product_id(
     )
 
 
+@router.post('/moviments/batch',
+             status_code=HTTPStatus.CREATED,
+             response_model=BatchMovimentList)
+async def register_moviments_batch(
+    session: T_Session,
+    moviments: list[BatchMovimentModel],
+    current_user: T_CurrentUser
+):
+    return await register_moviments_batch_service(
+        moviments=moviments,
+        session=session,
+        current_user=current_user
+    )
+
+
 @router.get('/moviments/user_enterpryse/{product_id}/',
             status_code=HTTPStatus.OK,
             response_model=MovimentList
@@ -126,15 +159,15 @@ async def register_exit_by_product_id(
 async def get_moviments_by_product_id_user_enterpryse(
     session: T_Session,
     product_id: int,
-    filter: Annotated[FilterPage, Query()],
+    page: Annotated[CursorPage, Query()],
     current_user: T_CurrentUser,
 ):
-    return {"products": await get_moviments_by_product_id_user_enterpryse_service(
+    return await get_moviments_by_product_id_user_enterpryse_service(
         product_id=product_id,
         session=session,
-        filter=filter,
+        page=page,
         current_user=current_user,
-    )}
+    )
 
 
 @router.get(
@@ -144,15 +177,58 @@ async def get_moviments_by_product_id_user_enterpryse(
     )
 async def get_all_moviments_by_enterpryse_user(
     session: T_Session,
-    filter: Annotated[FilterPage, Query()],
+    page: Annotated[CursorPage, Query()],
     current_user: T_CurrentUser
 ):
-    return {"products": await get_all_moviments_by_enterpryse_user_service(
+    return await get_all_moviments_by_enterpryse_user_service(
+        session=session,
+        page=page,
+        current_user=current_user
+    )
+
+
+@router.get('/export', status_code=HTTPStatus.OK)
+async def export_stock(
+    current_user: T_CurrentUser,
+    format: ExportFormatEnum = ExportFormatEnum.csv,
+    dataset: ExportDatasetEnum = ExportDatasetEnum.moviments,
+    date_from: Annotated[datetime | None, Query(alias='from')] = None,
+    date_to: Annotated[datetime | None, Query(alias='to')] = None,
+):
+    stream, media_type = export_stock_service(
+        current_user=current_user,
+        format=format,
+        dataset=dataset,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={
+            'Content-Disposition':
+                f'attachment; filename="{dataset.value}.{format.value}"'
+        },
+    )
+
+
+@router.get(
+    '/{product_id}/at',
+    status_code=HTTPStatus.OK,
+    response_model=StockAtDateModel
+    )
+async def get_stock_at_date(
+    product_id: int,
+    date: date,
+    session: T_Session,
+    current_user: T_CurrentUser,
+):
+    return await get_stock_at_date_service(
+        product_id=product_id,
+        at=date,
         session=session,
-        filter=filter,
         current_user=current_user
     )
-    }
 
 
 @router.get(
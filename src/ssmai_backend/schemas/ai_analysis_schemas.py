@@ -2,6 +2,10 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from ssmai_backend.enums.ai_analysis_enums import (
+    ForecastEngineEnum,
+    ForecastJobStatusEnum,
+)
 from ssmai_backend.schemas.stock_schemas import StockModel
 
 
@@ -13,6 +17,10 @@ class AnalysisSchema(BaseModel):
     pedir: float
 
 
+class BatchAnalysisSchema(AnalysisSchema):
+    product_id: int
+
+
 class HistoricoItem(BaseModel):
     data: datetime
     estoque: float
@@ -38,3 +46,20 @@ class IndicatorSchema(BaseModel):
 class IdealStockSchema(BaseModel):
     indicators: IndicatorSchema
     stock: StockModel
+
+
+class ForecastJobSchema(BaseModel):
+    id: int
+    status: ForecastJobStatusEnum
+    engine: ForecastEngineEnum | None
+    force: bool
+    total: int
+    processed: int
+    refreshed: int
+    skipped: int
+    failed: int
+    errors: dict[str, str]
+    eta_seconds: float | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
@@ -21,6 +21,38 @@ class ProductsList(BaseModel):
     products: list[PublicProductSchema]
 
 
+class ProductWithStockSchema(PublicProductSchema):
+    quantidade_disponivel: int | None
+    custo_medio: float | None
+    estoque_ideal: float | None
+
+
+class ProductsWithStockList(BaseModel):
+    products: list[ProductWithStockSchema]
+
+
+class ProductsWithStockPage(ProductsWithStockList):
+    next_cursor: str | None = None
+
+
+class ProductSearchSchema(PublicProductSchema):
+    similaridade: float | None
+
+
+class ProductSearchList(BaseModel):
+    products: list[ProductSearchSchema]
+
+
+class ProductBatchList(ProductsList):
+    skipped: list[str]
+
+
+class ProductImportSummary(BaseModel):
+    inserted: int
+    updated: int
+    skipped: int
+
+
 class ExtractResultSchema(BaseModel):
     id: int
     extracted: bool
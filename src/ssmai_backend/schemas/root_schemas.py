@@ -8,3 +8,8 @@ class Message(BaseModel):
 class FilterPage(BaseModel):
     offset: int = Field(ge=0, default=0)
     limit: int = Field(ge=0, default=10)
+
+
+class CursorPage(BaseModel):
+    cursor: str | None = None
+    limit: int = Field(ge=1, default=10)
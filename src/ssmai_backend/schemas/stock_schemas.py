@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from pydantic import BaseModel
 
@@ -40,9 +40,36 @@ class MovimentModelResponse(MovimentBaseModel):
     updated_at: datetime
 
 
+class BatchMovimentModel(MovimentBaseModel):
+    id_produtos: int
+    tipo: MovementTypesEnum
+    preco_und: float | None = None
+
+
+class BatchMovimentResult(BaseModel):
+    index: int
+    id_produtos: int
+    moviment: MovimentModelResponse | None = None
+    detail: str | None = None
+
+
+class BatchMovimentList(BaseModel):
+    results: list[BatchMovimentResult]
+
+
 class MovimentList(BaseModel):
     products: list[MovimentModelResponse]
+    next_cursor: str | None = None
 
 
 class StockList(BaseModel):
     stocks: list[StockModel]
+
+
+class StockAtDateModel(BaseModel):
+    id_produtos: int
+    data: date
+    quantidade_disponivel: int
+    custo_medio: float
+    snapshot_em: datetime | None
+    movimentacoes_aplicadas: int
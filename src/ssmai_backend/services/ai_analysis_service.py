@@ -1,68 +1,77 @@
+import logging
 from http import HTTPStatus
 
 import numpy as np
 import pandas as pd
 from fastapi import HTTPException
-from prophet import Prophet
 from scipy.stats import norm
 from sklearn.preprocessing import LabelEncoder
 from sqlalchemy import (
     Integer,
     ScalarResult,
     and_,
+    bindparam,
     case,
     delete,
     func,
-    insert,
     select,
+    update,
 )
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import cast
 
+from ssmai_backend.enums.ai_analysis_enums import ForecastEngineEnum
 from ssmai_backend.models.produto import (
     Estoque,
-    MovimentacoesEstoque,
+    MovimentacoesDiarias,
+    MovimentacoesResumo,
     Previsoes,
+    PrevisoesFingerprint,
     Produto,
 )
 from ssmai_backend.models.user import User
+from ssmai_backend.schemas.root_schemas import FilterPage
+from ssmai_backend.services.forecast_engine import (
+    FORECAST_HORIZON,
+    INSUFFICIENT_DATA_MESSAGE,
+    get_forecaster,
+)
+from ssmai_backend.services.graph_cache import get_graph_cache
+from ssmai_backend.settings import Settings
 
+logger = logging.getLogger(__name__)
 
-async def generate_dataset_moviments(session, id_produtos: int = None):
-    subquery_stmt = (
-        select(
-            MovimentacoesEstoque.id_produtos.label("id_produto"),
-            func.date(MovimentacoesEstoque.date).label("data"),
-            func.sum(
-                case((MovimentacoesEstoque.tipo == "saida", MovimentacoesEstoque.quantidade), else_=0)
-            ).label("quantidade_saida"),
-            func.sum(
-                case((MovimentacoesEstoque.tipo == "entrada", MovimentacoesEstoque.quantidade), else_=0)
-            ).label("quantidade_entrada"),
-            func.avg(MovimentacoesEstoque.preco_und).label("preco_und_medio"),
-            func.sum(MovimentacoesEstoque.total).label("valor_total")
-        )
-        .group_by(MovimentacoesEstoque.id_produtos, func.date(MovimentacoesEstoque.date))
-    )
-    if id_produtos is not None:
-        subquery_stmt = subquery_stmt.where(MovimentacoesEstoque.id_produtos == id_produtos)
-    subquery = subquery_stmt.subquery()
 
+async def generate_dataset_moviments(
+    session,
+    id_produtos: int | list[int] = None,
+    id_empresas: int = None
+):
     query = (
         select(
-            subquery.c.id_produto,
+            MovimentacoesDiarias.id_produtos.label("id_produto"),
             Produto.categoria,
             Estoque.custo_medio,
-            subquery.c.data,
-            subquery.c.quantidade_saida,
-            subquery.c.quantidade_entrada,
-            subquery.c.preco_und_medio,
-            subquery.c.valor_total,
+            MovimentacoesDiarias.data,
+            MovimentacoesDiarias.quantidade_saida,
+            MovimentacoesDiarias.quantidade_entrada,
+            (
+                MovimentacoesDiarias.soma_preco_und
+                / MovimentacoesDiarias.total_movimentacoes
+            ).label("preco_und_medio"),
+            MovimentacoesDiarias.valor_total,
         )
-        .join(Produto, Produto.id == subquery.c.id_produto)
+        .join(Produto, Produto.id == MovimentacoesDiarias.id_produtos)
         .join(Estoque, Estoque.id_produtos == Produto.id)
-        .order_by(subquery.c.id_produto, subquery.c.data)
+        .order_by(MovimentacoesDiarias.id_produtos, MovimentacoesDiarias.data)
     )
+    if isinstance(id_produtos, list):
+        query = query.where(MovimentacoesDiarias.id_produtos.in_(id_produtos))
+    elif id_produtos is not None:
+        query = query.where(MovimentacoesDiarias.id_produtos == id_produtos)
+    if id_empresas is not None:
+        query = query.where(Produto.id_empresas == id_empresas)
 
     dataset = await session.execute(query)
     moviments = dataset.all()
@@ -72,8 +81,14 @@ async def generate_dataset_moviments(session, id_produtos: int = None):
     return moviments
 
 
-async def generate_moviments_df(session, id_produtos: int = None):
-    dataset = await generate_dataset_moviments(session, id_produtos)
+async def generate_moviments_df(
+    session,
+    id_produtos: int | list[int] = None,
+    id_empresas: int = None
+):
+    dataset = await generate_dataset_moviments(
+        session, id_produtos, id_empresas
+    )
     df = pd.DataFrame(dataset, columns=[
         "id_produto",
         "categoria",
@@ -90,7 +105,11 @@ async def generate_moviments_df(session, id_produtos: int = None):
     df["mes"] = df["data"].dt.month
     df["is_weekend"] = df["dia_semana"].isin([5, 6]).astype(int)
     df["semana_do_ano"] = df["data"].dt.isocalendar().week.astype(int)
-    df["saldo_dia"] = df.groupby("id_produto")["quantidade_saida"].cumsum()
+    df["saldo_dia"] = (
+        (df["quantidade_entrada"] - df["quantidade_saida"])
+        .groupby(df["id_produto"])
+        .cumsum()
+    )
     le = LabelEncoder()
     df["categoria_encoded"] = le.fit_transform(df["categoria"])
 
@@ -110,20 +129,6 @@ async def prepare_dataframe_to_train(df_dataset: pd.DataFrame, product_id: int =
     return df_prophet
 
 
-async def create_forecast(df_to_prophet: pd.DataFrame, ai_model: Prophet) -> pd.DataFrame:
-    if df_to_prophet.shape[0] < 2 or df_to_prophet["y"].sum() == 0:
-        raise ValueError("Produto com dados insuficientes para previsão.")
-    ai_model.fit(df_to_prophet)
-
-    df_future = ai_model.make_future_dataframe(periods=15)
-
-    df_forecast = ai_model.predict(df_future)
-
-    df_forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].tail(15)
-
-    return df_forecast
-
-
 async def calculate_ideal_stock_by_df_forecast(df_forecast: pd.DataFrame):
     future_stock = df_forecast.tail(15)['saida_prevista']
     standart_deviation = future_stock.std()
@@ -136,21 +141,56 @@ async def calculate_ideal_stock_by_df_forecast(df_forecast: pd.DataFrame):
     return demanda_leadtime + safety_stock
 
 
-async def add_forecast_on_db_by_product_id(product_id: int,
-                                           df_forecast: pd.DataFrame,
-                                           session: AsyncSession):
-    statement = delete(Previsoes).where(Previsoes.id_produtos == product_id)
+async def write_forecasts_bulk(
+    session: AsyncSession,
+    forecasts: dict[int, pd.DataFrame],
+    horizon_only: bool = False
+):
+    if not forecasts:
+        return
+
+    frames = []
+    ideal_stocks = []
+    for product_id, df_forecast in forecasts.items():
+        df_saida = df_forecast[['ds', 'yhat_upper']].rename(
+            columns={'ds': 'data', 'yhat_upper': 'saida_prevista'}
+            )
+        estoque_ideal = await calculate_ideal_stock_by_df_forecast(df_saida)
+        ideal_stocks.append({
+            'b_id_produtos': product_id,
+            'b_estoque_ideal': float(estoque_ideal.item()),
+        })
+        df_rows = df_saida.tail(FORECAST_HORIZON) if horizon_only else df_saida
+        df_rows.insert(0, 'id_produtos', product_id)
+        frames.append(df_rows)
 
-    await session.execute(statement)
-    df_forecast = df_forecast[['ds', 'yhat_upper']].rename(
-        columns={'ds': 'data', 'yhat_upper': 'saida_prevista'}
-        )
-    df_forecast['id_produtos'] = product_id
-    forecast_dict = df_forecast.to_dict(orient="records")
-    await session.execute(insert(Previsoes), forecast_dict)
-    stock_db = await session.scalar(select(Estoque).where(Estoque.id_produtos == product_id))
-    estoque_ideal = await calculate_ideal_stock_by_df_forecast(df_forecast)
-    stock_db.estoque_ideal = float(estoque_ideal.item())
+    await session.execute(
+        delete(Previsoes).where(Previsoes.id_produtos.in_(list(forecasts)))
+    )
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(
+            "COPY previsoes (id_produtos, data, saida_prevista) FROM STDIN"
+        ) as copy:
+            for df_forecast in frames:
+                await copy.write(df_forecast.to_csv(
+                    sep='\t', header=False, index=False, na_rep='\\N',
+                    date_format='%Y-%m-%d %H:%M:%S'
+                ))
+
+    # updated_at é a versão do gráfico: clock_timestamp() marca a escrita,
+    # não o início da transação, e um job longo não grava versão mais velha
+    await connection.execute(
+        update(Estoque)
+        .where(Estoque.id_produtos == bindparam('b_id_produtos'))
+        .values(
+            estoque_ideal=bindparam('b_estoque_ideal'),
+            updated_at=func.clock_timestamp(),
+        ),
+        ideal_stocks
+    )
 
 
 async def create_df_by_object_model_list(obj_list: list[ScalarResult]):
@@ -161,33 +201,176 @@ async def create_df_by_object_model_list(obj_list: list[ScalarResult]):
     return pd.DataFrame(data)
 
 
-async def update_by_product_id_service(current_user, session, product_id):
-    ai_model = Prophet()
-    df_dataset = await generate_moviments_df(session, product_id)
+async def get_moviments_fingerprints(
+    session: AsyncSession,
+    id_empresas: int,
+    id_produtos: list[int] = None
+) -> dict[int, tuple]:
+    # Uma linha por produto, mantida pelo trigger: não agrega o histórico
+    statement = (
+        select(
+            MovimentacoesResumo.id_produtos,
+            MovimentacoesResumo.ultima_movimentacao_id,
+            MovimentacoesResumo.ultima_movimentacao_em,
+            MovimentacoesResumo.total_movimentacoes,
+            MovimentacoesResumo.soma_quantidade,
+        )
+        .join(Produto, Produto.id == MovimentacoesResumo.id_produtos)
+        .where(Produto.id_empresas == id_empresas)
+    )
+    if id_produtos is not None:
+        statement = statement.where(
+            MovimentacoesResumo.id_produtos.in_(id_produtos)
+        )
+
+    result = await session.execute(statement)
+    return {row[0]: tuple(row[1:]) for row in result.all()}
+
+
+async def get_stored_fingerprints(
+    session: AsyncSession,
+    id_produtos: list[int]
+) -> dict[int, tuple]:
+    result = await session.execute(
+        select(
+            PrevisoesFingerprint.id_produtos,
+            PrevisoesFingerprint.ultima_movimentacao_id,
+            PrevisoesFingerprint.ultima_movimentacao_em,
+            PrevisoesFingerprint.total_movimentacoes,
+            PrevisoesFingerprint.soma_quantidade,
+        ).where(PrevisoesFingerprint.id_produtos.in_(id_produtos))
+    )
+    return {row[0]: tuple(row[1:]) for row in result.all()}
+
+
+async def save_fingerprints(
+    session: AsyncSession,
+    fingerprints: dict[int, tuple]
+):
+    if not fingerprints:
+        return
+    rows = [
+        {
+            "id_produtos": product_id,
+            "ultima_movimentacao_id": fingerprint[0],
+            "ultima_movimentacao_em": fingerprint[1],
+            "total_movimentacoes": fingerprint[2],
+            "soma_quantidade": fingerprint[3],
+        }
+        for product_id, fingerprint in fingerprints.items()
+    ]
+    statement = pg_insert(PrevisoesFingerprint)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[PrevisoesFingerprint.id_produtos],
+        set_={
+            "ultima_movimentacao_id": excluded.ultima_movimentacao_id,
+            "ultima_movimentacao_em": excluded.ultima_movimentacao_em,
+            "total_movimentacoes": excluded.total_movimentacoes,
+            "soma_quantidade": excluded.soma_quantidade,
+            "updated_at": func.now(),
+        }
+    )
+    await session.execute(statement, rows)
+
+
+async def update_by_product_id_service(
+    current_user,
+    session,
+    product_id,
+    engine: ForecastEngineEnum | None = None
+):
+    df_dataset = await generate_moviments_df(
+        session, product_id, current_user.id_empresas
+    )
+    fingerprints = await get_moviments_fingerprints(
+        session, current_user.id_empresas, [product_id]
+    )
     df_to_prophet = await prepare_dataframe_to_train(df_dataset)
-    df_forecast = await create_forecast(df_to_prophet, ai_model)
-    await add_forecast_on_db_by_product_id(product_id, df_forecast, session)
+    forecasts, failures = await get_forecaster(engine).forecast(
+        {product_id: df_to_prophet}
+    )
+    if product_id in failures:
+        raise HTTPException(status_code=HTTPStatus.CONFLICT,
+                            detail=failures[product_id])
+    await write_forecasts_bulk(
+        session, forecasts, Settings().FORECAST_HORIZON_ONLY
+    )
+    await save_fingerprints(session, fingerprints)
     await session.commit()
     return {"message": 'Coleta realizada'}
 
 
-async def update_ai_predictions_to_enterpryse_service(
-    current_user: User,
-    session: AsyncSession
+async def refresh_enterpryse_forecasts(
+    session: AsyncSession,
+    id_empresas: int,
+    force: bool = False,
+    engine: ForecastEngineEnum | None = None,
+    tracker=None
 ):
-    df_dataset = await generate_moviments_df(session)
-    product_ids = df_dataset['id_produto'].unique()
-    for product_id in product_ids:
-        try:
-            ai_model = Prophet()
-            df_to_prophet = await prepare_dataframe_to_train(df_dataset, product_id)
-            df_forecast = await create_forecast(df_to_prophet, ai_model)
-            await add_forecast_on_db_by_product_id(product_id, df_forecast, session)
-        except ValueError as e:
-            print(f"[WARN] Produto {product_id}: {e}")
-            continue
+    fingerprints = await get_moviments_fingerprints(session, id_empresas)
+    if not fingerprints:
+        raise HTTPException(status_code=HTTPStatus.CONFLICT,
+                            detail='Product without moviments')
+    total_products = len(fingerprints)
+
+    if not force:
+        stored = await get_stored_fingerprints(session, list(fingerprints))
+        fingerprints = {
+            product_id: fingerprint
+            for product_id, fingerprint in fingerprints.items()
+            if stored.get(product_id) != fingerprint
+        }
+    if tracker:
+        await tracker.start(
+            total=len(fingerprints), skipped=total_products - len(fingerprints)
+        )
+
+    forecasts = {}
+    failures = {}
+    if fingerprints:
+        df_dataset = await generate_moviments_df(
+            session, list(fingerprints), id_empresas
+        )
+        frames = {
+            int(product_id): await prepare_dataframe_to_train(df_product)
+            for product_id, df_product in df_dataset.groupby('id_produto')
+        }
+        failures = {
+            product_id: 'Produto sem estoque para previsão.'
+            for product_id in fingerprints if product_id not in frames
+        }
+
+        if tracker:
+            for product_id, error in failures.items():
+                await tracker.advance(product_id, error)
+
+        forecasts, failed_forecasts = await get_forecaster(engine).forecast(
+            frames, tracker.advance if tracker else None
+        )
+        failures.update(failed_forecasts)
+        for product_id, error in failures.items():
+            logger.warning("Produto %s: %s", product_id, error)
+
+        await write_forecasts_bulk(
+            session, forecasts, Settings().FORECAST_HORIZON_ONLY
+        )
+        # Só falhas determinísticas: sem movimentação nova falhariam de novo
+        # a cada execução. As demais (worker, Prophet, estoque) voltam na
+        # próxima; force=True volta a treinar todos.
+        await save_fingerprints(session, {
+            product_id: fingerprint
+            for product_id, fingerprint in fingerprints.items()
+            if product_id in forecasts
+            or failures.get(product_id) == INSUFFICIENT_DATA_MESSAGE
+        })
     await session.commit()
-    return {"message": 'Coleta realizada'}
+    return {
+        "message": 'Coleta realizada',
+        "refreshed": len(forecasts),
+        "skipped": total_products - len(fingerprints),
+        "failed": len(failures),
+    }
 
 
 async def get_analysis_by_product_id_service(
@@ -196,7 +379,11 @@ async def get_analysis_by_product_id_service(
     service_level: float = 0.95,
     lead_time=2
 ):
-    forecasts_db = await session.scalars(select(Previsoes).where(Previsoes.id_produtos == product_id))
+    forecasts_db = await session.scalars(
+        select(Previsoes)
+        .where(Previsoes.id_produtos == product_id)
+        .order_by(Previsoes.data)
+    )
     forecasts_all = forecasts_db.all()
     if not forecasts_all:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
@@ -226,21 +413,99 @@ async def get_analysis_by_product_id_service(
     }
 
 
+async def get_batch_analysis_service(
+    current_user: User,
+    session: AsyncSession,
+    product_ids: list[int] | None = None,
+    service_level: float = 0.95,
+    lead_time: int = 2
+):
+    ranked = (
+        select(
+            Previsoes.id_produtos,
+            Previsoes.saida_prevista,
+            func.row_number().over(
+                partition_by=Previsoes.id_produtos,
+                order_by=Previsoes.data.desc()
+            ).label("posicao")
+        )
+        .join(Produto, Produto.id == Previsoes.id_produtos)
+        .where(Produto.id_empresas == current_user.id_empresas)
+    )
+    if product_ids:
+        ranked = ranked.where(Previsoes.id_produtos.in_(product_ids))
+    ranked = ranked.subquery()
+
+    result = await session.execute(
+        select(
+            ranked.c.id_produtos,
+            func.avg(ranked.c.saida_prevista).label("diary_average"),
+            func.stddev_samp(ranked.c.saida_prevista).label("standart_deviation"),
+            Estoque.quantidade_disponivel,
+        )
+        .join(Estoque, Estoque.id_produtos == ranked.c.id_produtos)
+        .where(ranked.c.posicao <= FORECAST_HORIZON)
+        .group_by(ranked.c.id_produtos, Estoque.quantidade_disponivel)
+        .order_by(ranked.c.id_produtos)
+    )
+    rows = result.all()
+    if not rows:
+        return []
+
+    product_id, diary_average, standart_deviation, available = (
+        np.array(column, dtype=float) for column in zip(*rows)
+    )
+    standart_deviation = np.nan_to_num(standart_deviation)
+
+    score = norm.ppf(service_level)
+    demanda_leadtime = diary_average * lead_time
+    safety_stock = score * standart_deviation * np.sqrt(lead_time)
+    ideal_stock = np.maximum(demanda_leadtime + safety_stock, 1)
+    faltante = np.maximum(demanda_leadtime + safety_stock - available, 0)
+
+    return [
+        {
+            "product_id": int(product_id[i]),
+            "diary_average": diary_average[i],
+            "demanda_leadtime": demanda_leadtime[i],
+            "safety_stock": safety_stock[i],
+            "estoque_ideal": ideal_stock[i],
+            "pedir": faltante[i],
+        }
+        for i in range(len(rows))
+    ]
+
+
+async def get_graph_version_service(
+    product_id: int,
+    session: AsyncSession,
+) -> str | None:
+    # O trigger de movimentações e a escrita das previsões tocam o estoque
+    updated_at = await session.scalar(
+        select(Estoque.updated_at).where(Estoque.id_produtos == product_id)
+    )
+    if updated_at is None:
+        return None
+    return f"{product_id}-{updated_at.timestamp():.6f}"
+
+
 async def get_graph_data_by_product_id_service(
     product_id: int,
     session: AsyncSession,
+    version: str | None = None
 ):
+    if version:
+        cached = await get_graph_cache().get(product_id, version)
+        if cached is not None:
+            return cached
 
     stmt_hist = (
         select(
-            func.date(MovimentacoesEstoque.date).label("data"),
-            func.sum(
-                case((MovimentacoesEstoque.tipo == "saida", MovimentacoesEstoque.quantidade), else_=0)
-            ).label("saida_dia")
+            MovimentacoesDiarias.data,
+            MovimentacoesDiarias.quantidade_saida.label("saida_dia")
         )
-        .where(MovimentacoesEstoque.id_produtos == product_id)
-        .group_by(func.date(MovimentacoesEstoque.date))
-        .order_by(func.date(MovimentacoesEstoque.date).asc())
+        .where(MovimentacoesDiarias.id_produtos == product_id)
+        .order_by(MovimentacoesDiarias.data.asc())
     )
 
     result_hist = await session.execute(stmt_hist)
@@ -266,104 +531,67 @@ async def get_graph_data_by_product_id_service(
     result_prev = await session.execute(stmt_prev)
 
     previsoes = [{"data": r.data, "saida_prevista": int(r.saida_prevista)} for r in result_prev]
-    return {
+    graph_data = {
         "historico": historico,
         "previsoes": previsoes
     }
+    if version:
+        await get_graph_cache().set(product_id, version, graph_data)
+    return graph_data
 
 
-async def get_worst_stock_deviation_service(session: AsyncSession, current_user: User):
+async def get_worst_stock_deviation_service(
+    session: AsyncSession,
+    current_user: User,
+    filter: FilterPage
+):
 
     difference_percent_schema = case(
-        (Estoque.estoque_ideal == 0, None),
+        (Estoque.estoque_ideal == 0, 0.0),
         else_=(
             (Estoque.quantidade_disponivel - Estoque.estoque_ideal) / Estoque.estoque_ideal
         ) * 100.0
     ).label("difference_percent")
 
-    abs_difference_percent = case(
-        (
-            (Estoque.estoque_ideal == 0) & (Estoque.quantidade_disponivel > 0),
-            9999999.0
-        ),
-        (
-            (Estoque.estoque_ideal == 0) & (Estoque.quantidade_disponivel <= 0),
-            0.0
-        ),
-        else_=func.abs(
-            (Estoque.quantidade_disponivel - Estoque.estoque_ideal) / Estoque.estoque_ideal
-        ) * 100.0
-    ).label("abs_difference_percent")
-
     difference_quantity = cast(
         (Estoque.quantidade_disponivel - Estoque.estoque_ideal), Integer
     ).label("difference_quantity")
-    bigger_than_expected = case(
-        ((Estoque.quantidade_disponivel - Estoque.estoque_ideal) > 0, True),
-        else_=False
+    bigger_than_expected = (
+        (Estoque.quantidade_disponivel - Estoque.estoque_ideal) > 0
     ).label("bigger_than_expected")
 
     cash_loss = ((Estoque.quantidade_disponivel - Estoque.estoque_ideal) * Estoque.custo_medio).label("cash_loss")
 
     stmt = (
         select(
-            Estoque.id,
-            Estoque.id_produtos,
-            Estoque.quantidade_disponivel,
-            Estoque.custo_medio,
-            Estoque.estoque_ideal,
-            Estoque.created_at,
-            Estoque.updated_at,
-
+            Estoque,
             difference_percent_schema,
             difference_quantity,
             bigger_than_expected,
             cash_loss,
-            abs_difference_percent
         )
-        .join(Produto, Estoque.id_produtos == Produto.id)
         .where(
             and_(
                 Estoque.estoque_ideal.isnot(None),
-                Produto.id_empresas == current_user.id_empresas
+                Estoque.id_empresas == current_user.id_empresas
             )
         )
-        .order_by(
-            abs_difference_percent.desc()
-        )
-        .limit(10)
+        .order_by(Estoque.abs_difference_percent.desc(), Estoque.id)
+        .offset(filter.offset)
+        .limit(filter.limit)
     )
 
     result = await session.execute(stmt)
 
-    df = pd.DataFrame(result.all())
-
-    if df.empty:
-        return []
-
-    df['difference_percent'] = df['difference_percent'].fillna(0.0)
-
-    df = df.drop(columns=['abs_difference_percent'], errors='ignore')
-    stock_cols = [
-        "id", "id_produtos", "quantidade_disponivel", "custo_medio",
-        "estoque_ideal", "created_at", "updated_at"
+    return [
+        {
+            "indicators": {
+                "difference_percent": row.difference_percent,
+                "difference_quantity": row.difference_quantity,
+                "bigger_than_expected": row.bigger_than_expected,
+                "cash_loss": row.cash_loss,
+            },
+            "stock": row.Estoque,
+        }
+        for row in result
     ]
-
-    indicator_cols = [
-        "difference_percent", "difference_quantity",
-        "bigger_than_expected", "cash_loss"
-    ]
-
-    response_data = []
-
-    for _, row in df.iterrows():
-        stock_data = row[stock_cols].to_dict()
-        indicator_data = row[indicator_cols].to_dict()
-
-        response_data.append({
-            "indicators": indicator_data,
-            "stock": stock_data
-        })
-
-    return response_data
-    return df.to_dict(orient="records")
@@ -0,0 +1,52 @@
+import asyncio
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+
+import pandas as pd
+from fastapi import HTTPException, UploadFile
+
+CSV_CHUNK_SIZE = 50_000
+
+
+async def iter_csv_chunks(
+    csv_file: UploadFile,
+    required_columns: set[str],
+    chunksize: int = CSV_CHUNK_SIZE
+) -> AsyncIterator[pd.DataFrame]:
+    """Parses the upload straight from its spooled file, one chunk at a
+    time, so memory stays bounded by ``chunksize`` and not by file size."""
+    if not csv_file.filename.endswith(".csv"):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Unexpected format"
+        )
+    await csv_file.seek(0)
+    try:
+        reader = await asyncio.to_thread(
+            pd.read_csv, csv_file.file, chunksize=chunksize
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Unable to read CSV"
+        )
+    with reader:
+        while True:
+            try:
+                df_chunk = await asyncio.to_thread(next, reader, None)
+            except (ValueError, UnicodeDecodeError):
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_REQUEST,
+                    detail="Unable to read CSV"
+                )
+            if df_chunk is None:
+                return
+            if not required_columns.issubset(df_chunk.columns):
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_REQUEST,
+                    detail=(
+                        "CSV deve conter as colunas: "
+                        f"{', '.join(required_columns)}"
+                    )
+                )
+            yield df_chunk
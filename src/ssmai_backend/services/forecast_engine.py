@@ -0,0 +1,325 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from os import process_cpu_count
+
+import numpy as np
+import pandas as pd
+
+from ssmai_backend.enums.ai_analysis_enums import ForecastEngineEnum
+from ssmai_backend.settings import Settings
+
+FORECAST_HORIZON = 15
+MIN_HISTORY_DAYS = 2
+# Mesmo intervalo de 80% usado pelo Prophet para o yhat_upper
+FORECAST_INTERVAL_Z = 1.2816
+INSUFFICIENT_DATA_MESSAGE = "Produto com dados insuficientes para previsão."
+BROKEN_WORKER_MESSAGE = (
+    "O processo de previsão deste produto foi encerrado inesperadamente."
+)
+
+ProgressCallback = Callable[[int, str | None], Awaitable[None]]
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _warm_up_worker():
+    # Roda uma vez em cada processo: importa o Prophet e carrega o modelo Stan
+    from prophet import Prophet  # noqa: PLC0415
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    Prophet()
+
+
+def _ping():
+    return True
+
+
+def has_enough_data(df_to_prophet: pd.DataFrame) -> bool:
+    return (
+        df_to_prophet.shape[0] >= MIN_HISTORY_DAYS
+        and df_to_prophet["y"].sum() != 0
+    )
+
+
+def fit_prophet_forecast(df_to_prophet: pd.DataFrame) -> pd.DataFrame:
+    from prophet import Prophet  # noqa: PLC0415
+
+    if not has_enough_data(df_to_prophet):
+        raise ValueError(INSUFFICIENT_DATA_MESSAGE)
+    ai_model = Prophet()
+    ai_model.fit(df_to_prophet)
+
+    df_future = ai_model.make_future_dataframe(periods=FORECAST_HORIZON)
+
+    df_forecast = ai_model.predict(df_future)
+
+    return df_forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+
+
+def get_forecast_workers() -> int:
+    return Settings().FORECAST_MAX_WORKERS or process_cpu_count() or 1
+
+
+def get_forecast_executor() -> ProcessPoolExecutor:
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=get_forecast_workers(),
+            mp_context=get_context("spawn"),
+            initializer=_warm_up_worker,
+        )
+    return _executor
+
+
+def warm_up_forecast_executor():
+    executor = get_forecast_executor()
+    for _ in range(get_forecast_workers()):
+        executor.submit(_ping)
+
+
+def shutdown_forecast_executor():
+    global _executor  # noqa: PLW0603
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def discard_forecast_executor(executor: ProcessPoolExecutor):
+    global _executor  # noqa: PLW0603
+    # Só descarta o pool que quebrou, não um já recriado por outra tarefa
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_forecast(df_to_prophet: pd.DataFrame) -> pd.DataFrame:
+    loop = asyncio.get_running_loop()
+    executor = get_forecast_executor()
+    try:
+        return await loop.run_in_executor(
+            executor, fit_prophet_forecast, df_to_prophet
+        )
+    except BrokenProcessPool:
+        discard_forecast_executor(executor)
+        raise
+
+
+async def warm_up_forecast_pool():
+    # Espera o initializer de cada worker antes de mandar trabalho de verdade
+    loop = asyncio.get_running_loop()
+    executor = get_forecast_executor()
+    try:
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, _ping)
+            for _ in range(get_forecast_workers())
+        ))
+    except BrokenProcessPool:
+        discard_forecast_executor(executor)
+
+
+async def run_forecasts(
+    frames: dict[int, pd.DataFrame],
+    progress: ProgressCallback | None = None,
+) -> tuple[dict[int, pd.DataFrame], dict[int, str]]:
+    """Forecast every product in the process pool.
+
+    A worker that dies breaks every future of its pool, not only its own.
+    Products lost that way are resubmitted together to a new, warmed pool;
+    only those that break it again are retried one at a time, so just a
+    product that breaks the pool on its own is marked as failed.
+    """
+    async def run_product(product_id):
+        try:
+            return product_id, await run_forecast(frames[product_id]), None
+        except Exception as e:
+            return product_id, None, e
+
+    forecasts = {}
+    failures = {}
+
+    async def finish(product_id, df_forecast, error):
+        if error is None:
+            forecasts[product_id] = df_forecast
+        else:
+            failures[product_id] = error
+        if progress:
+            await progress(product_id, error)
+
+    async def run_concurrently(product_ids):
+        broken = []
+        tasks = [run_product(product_id) for product_id in product_ids]
+        for task in asyncio.as_completed(tasks):
+            product_id, df_forecast, error = await task
+            if isinstance(error, BrokenProcessPool):
+                broken.append(product_id)
+            else:
+                await finish(product_id, df_forecast, error and str(error))
+        return broken
+
+    broken = await run_concurrently(frames)
+    if broken:
+        await warm_up_forecast_pool()
+        broken = await run_concurrently(broken)
+
+    for product_id in broken:
+        _, df_forecast, error = await run_product(product_id)
+        if isinstance(error, BrokenProcessPool):
+            error = BROKEN_WORKER_MESSAGE
+            await warm_up_forecast_pool()
+        await finish(product_id, df_forecast, error and str(error))
+    return forecasts, failures
+
+
+def _align_series(
+    series: list[pd.DataFrame],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Right-align every series in a products x days demand matrix"""
+    lengths = np.array([len(df_product) for df_product in series])
+    n_days = int(lengths.max())
+    demand = np.zeros((len(series), n_days))
+    observed = np.zeros((len(series), n_days), dtype=bool)
+    for row, df_product in enumerate(series):
+        start = n_days - lengths[row]
+        demand[row, start:] = df_product["y"].to_numpy(dtype=float)
+        observed[row, start:] = True
+    return demand, observed, lengths
+
+
+def _croston_smooth(
+    demand: np.ndarray,
+    observed: np.ndarray,
+    alpha: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fitted values per day and the flat forecast for each product"""
+    n_products, n_days = demand.shape
+    size = np.full(n_products, np.nan)
+    interval = np.full(n_products, np.nan)
+    periods = np.ones(n_products)
+    fitted = np.full((n_products, n_days), np.nan)
+    correction = 1 - alpha / 2
+    for day in range(n_days):
+        fitted[:, day] = correction * size / interval
+        active = observed[:, day]
+        has_demand = active & (demand[:, day] > 0)
+        first = has_demand & np.isnan(size)
+        update = has_demand & ~first
+
+        size[first] = demand[first, day]
+        interval[first] = periods[first]
+        size[update] += alpha * (demand[update, day] - size[update])
+        interval[update] += alpha * (periods[update] - interval[update])
+        periods = np.where(
+            has_demand, 1, np.where(active, periods + 1, periods)
+        )
+    return np.nan_to_num(fitted), correction * size / interval
+
+
+def _forecast_frame(
+    df_product: pd.DataFrame,
+    fitted: np.ndarray,
+    future: float,
+    band: float,
+) -> pd.DataFrame:
+    ds = pd.DatetimeIndex(df_product["ds"])
+    future_ds = pd.date_range(
+        ds[-1] + pd.Timedelta(days=1), periods=FORECAST_HORIZON, freq="D"
+    )
+    yhat = np.concatenate([fitted, np.full(FORECAST_HORIZON, future)])
+    return pd.DataFrame({
+        "ds": ds.append(future_ds),
+        "yhat": yhat,
+        "yhat_lower": np.clip(yhat - band, 0, None),
+        "yhat_upper": yhat + band,
+    })
+
+
+def croston_forecast_batch(
+    frames: dict[int, pd.DataFrame],
+    alpha: float = 0.1,
+) -> tuple[dict[int, pd.DataFrame], dict[int, str]]:
+    """Croston (SBA) for all products at once, one column per day.
+
+    Series are right-aligned in a products x days matrix so every product
+    keeps its own history window and its horizon starts after its own
+    last day, exactly like the Prophet forecasts.
+    """
+    failures = {}
+    series = {}
+    for product_id, df_to_prophet in frames.items():
+        if has_enough_data(df_to_prophet):
+            series[product_id] = df_to_prophet
+        else:
+            failures[product_id] = INSUFFICIENT_DATA_MESSAGE
+    if not series:
+        return {}, failures
+
+    demand, observed, lengths = _align_series(list(series.values()))
+    fitted, future = _croston_smooth(demand, observed, alpha)
+    residuals = np.where(observed, demand - fitted, np.nan)
+    sigma = np.nan_to_num(np.sqrt(np.nanmean(residuals ** 2, axis=1)))
+    band = FORECAST_INTERVAL_Z * sigma
+
+    n_days = demand.shape[1]
+    forecasts = {
+        product_id: _forecast_frame(
+            df_product,
+            fitted[row, n_days - lengths[row]:],
+            future[row],
+            band[row],
+        )
+        for row, (product_id, df_product) in enumerate(series.items())
+    }
+    return forecasts, failures
+
+
+class Forecaster(ABC):
+    @abstractmethod
+    async def forecast(
+        self,
+        frames: dict[int, pd.DataFrame],
+        progress: ProgressCallback | None = None,
+    ) -> tuple[dict[int, pd.DataFrame], dict[int, str]]:
+        """Forecast every frame (ds, y), returning forecasts and failures.
+
+        Each forecast has the ds, yhat, yhat_lower and yhat_upper columns
+        for the history plus FORECAST_HORIZON future days. progress is
+        awaited with (product_id, error) as each product finishes.
+        """
+
+
+class ProphetForecaster(Forecaster):
+    async def forecast(  # noqa: PLR6301
+        self,
+        frames: dict[int, pd.DataFrame],
+        progress: ProgressCallback | None = None,
+    ) -> tuple[dict[int, pd.DataFrame], dict[int, str]]:
+        return await run_forecasts(frames, progress)
+
+
+class CrostonForecaster(Forecaster):
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+
+    async def forecast(self, frames, progress=None):
+        forecasts, failures = await asyncio.to_thread(
+            croston_forecast_batch, frames, self.alpha
+        )
+        if progress:
+            for product_id in frames:
+                await progress(product_id, failures.get(product_id))
+        return forecasts, failures
+
+
+FORECASTERS: dict[ForecastEngineEnum, type[Forecaster]] = {
+    ForecastEngineEnum.prophet: ProphetForecaster,
+    ForecastEngineEnum.croston: CrostonForecaster,
+}
+
+
+def get_forecaster(engine: ForecastEngineEnum | None = None) -> Forecaster:
+    return FORECASTERS[engine or Settings().FORECAST_ENGINE]()
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+from datetime import timedelta
+from http import HTTPStatus
+from time import monotonic
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ssmai_backend.database import engine
+from ssmai_backend.enums.ai_analysis_enums import (
+    ForecastEngineEnum,
+    ForecastJobStatusEnum,
+)
+from ssmai_backend.models.forecast_job import ForecastJob
+from ssmai_backend.models.user import User
+from ssmai_backend.services.ai_analysis_service import (
+    refresh_enterpryse_forecasts,
+)
+from ssmai_backend.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (ForecastJobStatusEnum.queued, ForecastJobStatusEnum.running)
+
+_workers: list[asyncio.Task] = []
+
+
+class ForecastJobTracker:
+    """Persists the progress of a running job from its own session.
+
+    Progress commits are throttled to one per PROGRESS_INTERVAL seconds.
+    The heartbeat that keeps a live job from being requeued runs apart in
+    heartbeat(), since loading, fitting and writing can go long stretches
+    without any progress.
+    """
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.values = {"processed": 0, "failed": 0}
+        self.errors = {}
+        self._last_flush = 0.0
+
+    async def _flush(self, **values):
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                update(ForecastJob)
+                .where(ForecastJob.id == self.job_id)
+                .values(**self.values, errors=self.errors, **values)
+            )
+            await session.commit()
+        self._last_flush = monotonic()
+
+    async def heartbeat(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSession(engine) as session:
+                    await session.execute(
+                        update(ForecastJob)
+                        .where(
+                            ForecastJob.id == self.job_id,
+                            ForecastJob.status
+                            == ForecastJobStatusEnum.running,
+                        )
+                        .values(updated_at=func.now())
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception(
+                    "Forecast job %s heartbeat failed", self.job_id
+                )
+
+    async def start(self, total: int, skipped: int):
+        self.values.update(total=total, skipped=skipped)
+        await self._flush()
+
+    async def advance(self, product_id: int, error: str | None = None):
+        self.values["processed"] += 1
+        if error is not None:
+            self.values["failed"] += 1
+            self.errors[str(product_id)] = error
+        if monotonic() - self._last_flush >= self.PROGRESS_INTERVAL:
+            await self._flush()
+
+    async def finish(
+        self, summary: dict | None = None, error: str | None = None
+    ):
+        if summary:
+            self.values.update(
+                refreshed=summary["refreshed"],
+                skipped=summary["skipped"],
+                failed=summary["failed"],
+            )
+        if error is not None:
+            self.errors["job"] = error
+        await self._flush(
+            status=(
+                ForecastJobStatusEnum.failed if error is not None
+                else ForecastJobStatusEnum.done
+            ),
+            finished_at=func.now(),
+        )
+
+
+async def enqueue_forecast_job_service(
+    current_user: User,
+    session: AsyncSession,
+    force: bool = False,
+    forecast_engine: ForecastEngineEnum | None = None,
+):
+    active_job = select(ForecastJob).where(
+        ForecastJob.id_empresas == current_user.id_empresas,
+        ForecastJob.status.in_(ACTIVE_STATUSES),
+    )
+    job_db = await session.scalar(active_job)
+    if job_db:
+        if force and not job_db.force:
+            # Ainda na fila: o job passa a retreinar todos os produtos
+            result = await session.execute(
+                update(ForecastJob)
+                .where(
+                    ForecastJob.id == job_db.id,
+                    ForecastJob.status == ForecastJobStatusEnum.queued,
+                )
+                .values(force=True)
+            )
+            await session.commit()
+            # Já em execução sem force: não dá para aplicar nem enfileirar
+            # outro, o índice só admite um job ativo por empresa
+            if result.rowcount == 0:
+                raise HTTPException(
+                    status_code=HTTPStatus.CONFLICT,
+                    detail='Forecast job already running without force',
+                )
+        return await get_forecast_job_service(job_db.id, current_user, session)
+
+    job_db = ForecastJob(
+        id_empresas=current_user.id_empresas,
+        engine=forecast_engine,
+        force=force,
+    )
+    session.add(job_db)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Outro pedido criou o job da empresa ao mesmo tempo
+        await session.rollback()
+        job_db = await session.scalar(active_job)
+    return await get_forecast_job_service(job_db.id, current_user, session)
+
+
+async def get_forecast_job_service(
+    job_id: int,
+    current_user: User,
+    session: AsyncSession,
+):
+    result = await session.execute(
+        select(
+            ForecastJob,
+            func.extract(
+                'epoch',
+                func.coalesce(ForecastJob.finished_at, func.now())
+                - ForecastJob.started_at
+            ).label("elapsed"),
+        ).where(
+            ForecastJob.id == job_id,
+            ForecastJob.id_empresas == current_user.id_empresas,
+        ).execution_options(populate_existing=True)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
+                            detail='Job not found!')
+    job_db, elapsed = row
+
+    eta_seconds = None
+    if job_db.status == ForecastJobStatusEnum.running and job_db.processed:
+        remaining = job_db.total - job_db.processed
+        eta_seconds = float(elapsed) / job_db.processed * remaining
+    return {
+        "id": job_db.id,
+        "status": job_db.status,
+        "engine": job_db.engine,
+        "force": job_db.force,
+        "total": job_db.total,
+        "processed": job_db.processed,
+        "refreshed": job_db.refreshed,
+        "skipped": job_db.skipped,
+        "failed": job_db.failed,
+        "errors": job_db.errors,
+        "eta_seconds": eta_seconds,
+        "created_at": job_db.created_at,
+        "started_at": job_db.started_at,
+        "finished_at": job_db.finished_at,
+    }
+
+
+async def claim_next_forecast_job(session: AsyncSession) -> ForecastJob | None:
+    stale_before = func.now() - timedelta(
+        seconds=Settings().FORECAST_JOB_STALE_SECONDS
+    )
+    job_db = await session.scalar(
+        select(ForecastJob)
+        .where(
+            or_(
+                ForecastJob.status == ForecastJobStatusEnum.queued,
+                and_(
+                    ForecastJob.status == ForecastJobStatusEnum.running,
+                    ForecastJob.updated_at < stale_before,
+                ),
+            )
+        )
+        .order_by(ForecastJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if not job_db:
+        return None
+
+    job_db.status = ForecastJobStatusEnum.running
+    job_db.started_at = func.now()
+    job_db.processed = 0
+    job_db.failed = 0
+    job_db.errors = {}
+    await session.commit()
+    return job_db
+
+
+async def process_next_forecast_job() -> bool:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        job_db = await claim_next_forecast_job(session)
+        if not job_db:
+            return False
+        job_id = job_db.id
+        id_empresas = job_db.id_empresas
+        force = job_db.force
+        forecast_engine = job_db.engine
+
+    tracker = ForecastJobTracker(job_id)
+    heartbeat = asyncio.create_task(
+        tracker.heartbeat(Settings().FORECAST_JOB_HEARTBEAT_SECONDS)
+    )
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            summary = await refresh_enterpryse_forecasts(
+                session, id_empresas, force, forecast_engine, tracker
+            )
+    except HTTPException as e:
+        await tracker.finish(error=e.detail)
+    except Exception as e:
+        logger.exception("Forecast job %s failed", job_id)
+        await tracker.finish(error=str(e))
+    else:
+        await tracker.finish(summary)
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+    return True
+
+
+async def forecast_jobs_worker():
+    poll_seconds = Settings().FORECAST_JOB_POLL_SECONDS
+    while True:
+        try:
+            processed = await process_next_forecast_job()
+        except Exception:
+            logger.exception("Forecast job worker error")
+            processed = False
+        if not processed:
+            await asyncio.sleep(poll_seconds)
+
+
+def start_forecast_job_workers():
+    for _ in range(Settings().FORECAST_JOB_WORKERS):
+        _workers.append(asyncio.create_task(forecast_jobs_worker()))
+
+
+async def stop_forecast_job_workers():
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
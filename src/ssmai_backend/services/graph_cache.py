@@ -0,0 +1,125 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import timedelta
+from time import monotonic
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ssmai_backend.database import engine
+from ssmai_backend.enums.ai_analysis_enums import GraphCacheBackendEnum
+from ssmai_backend.models.produto import PrevisoesGraficoCache
+from ssmai_backend.settings import Settings
+
+
+class GraphCache(ABC):
+    """Cache of graph payloads keyed by product and data version.
+
+    A new movement or forecast rewrite changes the version, so stale
+    entries are never served and simply get replaced on the next miss.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    async def get(self, product_id: int, version: str) -> dict | None: ...
+
+    @abstractmethod
+    async def set(self, product_id: int, version: str, payload: dict): ...
+
+
+class MemoryGraphCache(GraphCache):
+    def __init__(self, ttl_seconds: int, max_items: int):
+        super().__init__(ttl_seconds)
+        self.max_items = max_items
+        self._items: OrderedDict[int, tuple[str, float, dict]] = OrderedDict()
+
+    async def get(self, product_id, version):
+        item = self._items.get(product_id)
+        if item is None:
+            return None
+        cached_version, expires_at, payload = item
+        if cached_version != version or expires_at < monotonic():
+            del self._items[product_id]
+            return None
+        self._items.move_to_end(product_id)
+        return payload
+
+    async def set(self, product_id, version, payload):
+        self._items[product_id] = (
+            version, monotonic() + self.ttl_seconds, payload
+        )
+        self._items.move_to_end(product_id)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+class PostgresGraphCache(GraphCache):
+    """Shared between app instances through an UNLOGGED table"""
+
+    async def get(  # noqa: PLR6301
+        self, product_id: int, version: str
+    ) -> dict | None:
+        async with AsyncSession(engine) as session:
+            return await session.scalar(
+                select(PrevisoesGraficoCache.payload).where(
+                    PrevisoesGraficoCache.id_produtos == product_id,
+                    PrevisoesGraficoCache.versao == version,
+                    PrevisoesGraficoCache.expires_at > func.now(),
+                )
+            )
+
+    async def set(self, product_id, version, payload):
+        values = {
+            "id_produtos": product_id,
+            "versao": version,
+            "payload": jsonable_encoder(payload),
+            "expires_at": func.now() + timedelta(seconds=self.ttl_seconds),
+        }
+        stmt = pg_insert(PrevisoesGraficoCache).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PrevisoesGraficoCache.id_produtos],
+            set_={
+                "versao": stmt.excluded.versao,
+                "payload": stmt.excluded.payload,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+        async with AsyncSession(engine) as session:
+            await session.execute(stmt)
+            await session.commit()
+
+
+def format_etag(version: str) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: str, version: str) -> bool:
+    """Weak comparison of an If-None-Match header (RFC 9110 13.1.2)"""
+    for raw_tag in if_none_match.split(","):
+        tag = raw_tag.strip()
+        if tag == "*":
+            return True
+        if tag.removeprefix("W/").strip('"') == version:
+            return True
+    return False
+
+
+_graph_cache: GraphCache | None = None
+
+
+def get_graph_cache() -> GraphCache:
+    global _graph_cache  # noqa: PLW0603
+    if _graph_cache is None:
+        settings = Settings()
+        if settings.GRAPH_CACHE_BACKEND == GraphCacheBackendEnum.postgres:
+            _graph_cache = PostgresGraphCache(settings.GRAPH_CACHE_TTL_SECONDS)
+        else:
+            _graph_cache = MemoryGraphCache(
+                settings.GRAPH_CACHE_TTL_SECONDS,
+                settings.GRAPH_CACHE_MAX_ITEMS,
+            )
+    return _graph_cache
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ssmai_backend.database import engine
+from ssmai_backend.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_maintenance_tasks: list[asyncio.Task] = []
+
+
+async def create_moviments_partitions(months_ahead: int):
+    """Keep monthly partitions of movimentacoes_estoque ahead of today.
+
+    The function is idempotent and moves any rows that fell into the
+    default partition into the new month, so it is safe to run often.
+    """
+    async with AsyncSession(engine) as session:
+        await session.execute(
+            text(
+                "SELECT fn_criar_particoes_movimentacoes(current_date, :meses)"
+            ),
+            {"meses": months_ahead + 1},
+        )
+        await session.commit()
+
+
+async def partitions_maintenance_worker():
+    settings = Settings()
+    while True:
+        try:
+            await create_moviments_partitions(
+                settings.MOVIMENTS_PARTITIONS_AHEAD
+            )
+        except Exception:
+            logger.exception("Failed to create movement partitions")
+        await asyncio.sleep(settings.MOVIMENTS_PARTITIONS_INTERVAL_SECONDS)
+
+
+def start_partitions_maintenance():
+    _maintenance_tasks.append(asyncio.create_task(partitions_maintenance_worker()))
+
+
+async def stop_partitions_maintenance():
+    for task in _maintenance_tasks:
+        task.cancel()
+    await asyncio.gather(*_maintenance_tasks, return_exceptions=True)
+    _maintenance_tasks.clear()
@@ -7,15 +7,21 @@ from re import sub
 
 import pandas as pd
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import and_, delete, insert, select
+from sqlalchemy import and_, delete, func, null, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from PyPDF2 import PdfReader
 
+from ssmai_backend.enums.products_enums import (
+    ProductSearchModeEnum,
+    StockStatusEnum,
+)
 from ssmai_backend.models.document import Document
 from ssmai_backend.models.produto import Estoque, Previsoes, Produto
 from ssmai_backend.models.user import User
+from ssmai_backend.pagination import paginate_by_keyset
 from ssmai_backend.schemas.products_schemas import ProductSchema
-from ssmai_backend.schemas.root_schemas import FilterPage
+from ssmai_backend.schemas.root_schemas import CursorPage, FilterPage
+from ssmai_backend.services.csv_import import iter_csv_chunks
 from ssmai_backend.settings import Settings
 
 # def get_text_extracted():
@@ -732,45 +738,71 @@ async def find_product_by_id_if_same_enterpryse(id: int, session: AsyncSession,
     return product_db
 
 
+# Produto e estoque no mesmo statement: sem janela para produto sem estoque.
+# Nomes já existentes (ou repetidos na lista) são ignorados pelo índice único
+CREATE_PRODUCTS = """
+    WITH novos AS (
+        INSERT INTO produtos (id_empresas, nome, categoria)
+        SELECT :id_empresas, nome, categoria
+        FROM unnest(CAST(:nomes AS TEXT[]), CAST(:categorias AS TEXT[]))
+            WITH ORDINALITY AS t(nome, categoria, ordem)
+        ORDER BY ordem
+        ON CONFLICT (id_empresas, nome) DO NOTHING
+        RETURNING id, id_empresas, nome, categoria, image,
+                  created_at, updated_at
+    ),
+    novo_estoque AS (
+        INSERT INTO estoque (
+            id_produtos, id_empresas, quantidade_disponivel, custo_medio
+        )
+        SELECT id, id_empresas, 0, 0 FROM novos
+    )
+    SELECT id, id_empresas, nome, categoria, image, created_at, updated_at
+    FROM novos
+    ORDER BY id
+"""
+
+
+async def create_products_service(
+    products: list[ProductSchema],
+    session: AsyncSession,
+    current_user: User
+):
+    created = (await session.scalars(
+        select(Produto).from_statement(
+            text(CREATE_PRODUCTS).columns(*Produto.__table__.c)
+        ),
+        {
+            "id_empresas": current_user.id_empresas,
+            "nomes": [product.nome for product in products],
+            "categorias": [product.categoria for product in products],
+        },
+    )).all()
+    await session.commit()
+
+    created_names = {product.nome for product in created}
+    skipped = []
+    for product in products:
+        if product.nome in created_names:
+            created_names.discard(product.nome)
+        else:
+            skipped.append(product.nome)
+    return {"products": created, "skipped": skipped}
+
+
 async def create_product_service(
     product: ProductSchema,
     session: AsyncSession,
     current_user: User,
     is_batch=False
 ):
-    db_product = await session.scalar(
-        select(Produto).where(
-            and_(
-                Produto.nome == product.nome,
-                Produto.id_empresas == current_user.id_empresas
-            )
-            )
-    )
-
-    if db_product:
+    result = await create_products_service([product], session, current_user)
+    if not result["products"]:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT, detail="Product already exists!"
         )
 
-    db_product = Produto(
-        nome=product.nome,
-        categoria=product.categoria,
-        id_empresas=current_user.id_empresas
-    )
-
-    session.add(db_product)
-
-    await session.commit()
-    await session.refresh(db_product)
-    estoque_db = Estoque(
-        id_produtos=db_product.id,
-        quantidade_disponivel=0,
-        custo_medio=0
-        )
-    session.add(estoque_db)
-    await session.commit()
-
-    return db_product
+    return result["products"][0]
 
 
 async def read_all_products_service(session: AsyncSession,
@@ -948,53 +980,93 @@ async def generate_product_info_from_docs_pre_extracted_service(
     return informations_values
 
 
-async def insert_products_with_csv_service(
-    session: AsyncSession,
-    current_user: User,
-    csv_file: UploadFile
-):
-    if not csv_file.filename.endswith(".csv"):
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail="Unexpected format"
+# Upsert por (id_empresas, nome) com ids do próprio banco; o estoque dos
+# produtos novos nasce no mesmo statement. xmax = 0 só em linha inserida.
+# Linhas idênticas às do banco nem chegam ao INSERT e não gastam a sequence
+UPSERT_PRODUCTS = """
+    WITH entrada AS (
+        SELECT *
+        FROM unnest(CAST(:nomes AS TEXT[]), CAST(:categorias AS TEXT[]))
+            AS t(nome, categoria)
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM produtos p
+            WHERE p.id_empresas = :id_empresas
+              AND p.nome = t.nome
+              AND p.categoria = t.categoria
         )
-    contents = await csv_file.read()
-    try:
-        df_produtos = pd.read_csv(pd.io.common.BytesIO(contents))
-    except Exception:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail="Unable to read CSV"
-        )
-    required_columns = {"id", "nome", "categoria", "created_at", "updated_at"}
-    if not required_columns.issubset(df_produtos.columns):
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail=f"CSV deve conter as colunas: {', '.join(required_columns)}"
+    ),
+    upsert AS (
+        INSERT INTO produtos (id_empresas, nome, categoria)
+        SELECT :id_empresas, nome, categoria FROM entrada
+        ON CONFLICT (id_empresas, nome) DO UPDATE
+        SET categoria = EXCLUDED.categoria,
+            updated_at = NOW()
+        WHERE produtos.categoria IS DISTINCT FROM EXCLUDED.categoria
+        RETURNING id, (xmax = 0) AS inserido
+    ),
+    novo_estoque AS (
+        INSERT INTO estoque (
+            id_produtos, id_empresas, quantidade_disponivel, custo_medio
         )
+        SELECT id, :id_empresas, 0, 0 FROM upsert WHERE inserido
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE inserido) AS inserted,
+        COUNT(*) FILTER (WHERE NOT inserido) AS updated
+    FROM upsert
+"""
 
-    df_produtos["id_empresas"] = current_user.id_empresas
 
-    products_dict = df_produtos.to_dict(orient="records")
-    df_estoque = pd.DataFrame({
-        "id": df_produtos["id"],
-        "id_produtos": df_produtos["id"],
-        "quantidade_disponivel": 0,
-        "custo_medio": 0.0,
-        "created_at": df_produtos['created_at'],
-        "updated_at": df_produtos['updated_at']
-        })
+async def upsert_products_chunk(
+    session: AsyncSession,
+    current_user: User,
+    df_chunk: pd.DataFrame
+) -> dict[str, int]:
+    # O mesmo nome duas vezes no statement quebraria o ON CONFLICT
+    df_produtos = (
+        df_chunk.dropna(subset=["nome", "categoria"])
+        .astype({"nome": str, "categoria": str})
+        .drop_duplicates(subset="nome", keep="last")
+    )
+    result = (await session.execute(
+        text(UPSERT_PRODUCTS),
+        {
+            "nomes": df_produtos["nome"].tolist(),
+            "categorias": df_produtos["categoria"].tolist(),
+            "id_empresas": current_user.id_empresas,
+        },
+    )).one()
+    return {
+        "inserted": result.inserted,
+        "updated": result.updated,
+        "skipped": len(df_chunk) - result.inserted - result.updated,
+    }
+
 
-    estoque_dict = df_estoque.to_dict(orient="records")
+async def insert_products_with_csv_service(
+    session: AsyncSession,
+    current_user: User,
+    csv_file: UploadFile
+):
+    required_columns = {"nome", "categoria"}
+    summary = {"inserted": 0, "updated": 0, "skipped": 0}
     try:
-        await session.execute(insert(Produto), products_dict)
-        await session.execute(insert(Estoque), estoque_dict)
+        async for df_chunk in iter_csv_chunks(csv_file, required_columns):
+            counts = await upsert_products_chunk(
+                session, current_user, df_chunk
+            )
+            for key, count in counts.items():
+                summary[key] += count
         await session.commit()
+    except HTTPException:
+        await session.rollback()
+        raise
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao inserir dados: {e}")
 
-    return {'message': 'success'}
+    return summary
 
 
 async def delete_all_products_by_enterpryse_id_service(
@@ -1029,14 +1101,112 @@ async def get_all_products_with_analysis_service(
         current_user: User
 ):
 
-    stmt_join = (
-    select(Produto)
-    .join(Previsoes, Produto.id == Previsoes.id_produtos)
-    .where(Produto.id_empresas == current_user.id_empresas)
-    .distinct().limit(filter.limit).offset(filter.offset)
+    # Semi-join: para na primeira previsão pelo ix_previsoes_produto_data,
+    # sem montar e deduplicar o join com todas as previsões
+    has_forecast = (
+        select(Previsoes.id)
+        .where(Previsoes.id_produtos == Produto.id)
+        .exists()
+    )
+    stmt = (
+        select(
+            *Produto.__table__.c,
+            Estoque.quantidade_disponivel,
+            Estoque.custo_medio,
+            Estoque.estoque_ideal,
+        )
+        .outerjoin(Estoque, Estoque.id_produtos == Produto.id)
+        .where(Produto.id_empresas == current_user.id_empresas, has_forecast)
+        .order_by(Produto.id)
+        .limit(filter.limit).offset(filter.offset)
     )
-    products_db = await session.scalars(stmt_join)
-    return products_db.all()
+    result = await session.execute(stmt)
+    return result.all()
+
+
+# Produto sem linha de estoque conta como sem estoque
+STOCK_STATUS_FILTERS = {
+    StockStatusEnum.sem_estoque:
+        func.coalesce(Estoque.quantidade_disponivel, 0) <= 0,
+    StockStatusEnum.abaixo_do_ideal:
+        Estoque.quantidade_disponivel < Estoque.estoque_ideal,
+    StockStatusEnum.acima_do_ideal:
+        Estoque.quantidade_disponivel > Estoque.estoque_ideal,
+}
+
+
+async def get_products_with_stock_service(
+    session: AsyncSession,
+    page: CursorPage,
+    categoria: str | None,
+    status: StockStatusEnum | None,
+    current_user: User
+):
+    stmt = (
+        select(
+            *Produto.__table__.c,
+            Estoque.quantidade_disponivel,
+            Estoque.custo_medio,
+            Estoque.estoque_ideal,
+        )
+        .outerjoin(Estoque, Estoque.id_produtos == Produto.id)
+        .where(Produto.id_empresas == current_user.id_empresas)
+    )
+    if categoria is not None:
+        stmt = stmt.where(Produto.categoria == categoria)
+    if status is not None:
+        stmt = stmt.where(STOCK_STATUS_FILTERS[status])
+
+    # Linhas em vez de entidades: sem identity map para páginas grandes
+    products, next_cursor = await paginate_by_keyset(
+        session, stmt, Produto.created_at, Produto.id, page, rows=True
+    )
+    return {"products": products, "next_cursor": next_cursor}
+
+
+async def search_products_service(
+    q: str,
+    mode: ProductSearchModeEnum,
+    limit: int,
+    session: AsyncSession,
+    current_user: User
+):
+    if mode == ProductSearchModeEnum.prefix:
+        # Padrão montado aqui: o LIKE com constante usa o índice por prefixo
+        nome = func.lower(Produto.nome).collate("C")
+        pattern = (
+            q.lower().replace("\\", "\\\\")
+            .replace("%", "\\%").replace("_", "\\_") + "%"
+        )
+        stmt = (
+            select(*Produto.__table__.c, null().label("similaridade"))
+            .where(
+                Produto.id_empresas == current_user.id_empresas,
+                nome.like(pattern, escape="\\"),
+            )
+            .order_by(nome, Produto.id)
+        )
+    else:
+        # %> (word similarity) é atendido pelo GIN trigram por empresa
+        similaridade = func.greatest(
+            func.word_similarity(q, Produto.nome),
+            func.word_similarity(q, Produto.categoria),
+        )
+        stmt = (
+            select(*Produto.__table__.c, similaridade.label("similaridade"))
+            .where(
+                Produto.id_empresas == current_user.id_empresas,
+                or_(
+                    Produto.nome.op("%>")(q),
+                    Produto.categoria.op("%>")(q),
+                ),
+            )
+            .order_by(similaridade.desc(), Produto.id)
+        )
+
+    # Linhas de colunas, sem montar objetos ORM a cada tecla digitada
+    result = await session.execute(stmt.limit(limit))
+    return result.all()
 
 
 async def update_product_image_service(
@@ -0,0 +1,201 @@
+import csv
+import io
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import String, cast, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ssmai_backend.database import engine
+from ssmai_backend.enums.products_enums import (
+    ExportDatasetEnum,
+    ExportFormatEnum,
+)
+from ssmai_backend.models.produto import (
+    Estoque,
+    MovimentacoesEstoque,
+    Produto,
+)
+from ssmai_backend.models.user import User
+
+EXPORT_CHUNK_SIZE = 10_000
+
+# Mesmas colunas do CSV de /moviments/insert_batch, para reimportar
+MOVIMENTS_COLUMNS = {
+    "id": "int64",
+    "id_produtos": "int64",
+    "tipo": "string",
+    "quantidade": "int64",
+    "preco_und": "float64",
+    "total": "float64",
+    "date": "timestamp",
+    "updated_at": "timestamp",
+}
+
+STOCK_COLUMNS = {
+    "id_produtos": "int64",
+    "nome": "string",
+    "categoria": "string",
+    "quantidade_disponivel": "int64",
+    "custo_medio": "float64",
+    "estoque_ideal": "float64",
+    "updated_at": "timestamp",
+}
+
+PARQUET_TYPES = {
+    "int64": pa.int64(),
+    "float64": pa.float64(),
+    "string": pa.string(),
+    "timestamp": pa.timestamp("us"),
+}
+
+MEDIA_TYPES = {
+    ExportFormatEnum.csv: "text/csv",
+    ExportFormatEnum.parquet: "application/vnd.apache.parquet",
+}
+
+
+def build_export_statement(
+    dataset: ExportDatasetEnum,
+    current_user: User,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+):
+    if dataset == ExportDatasetEnum.stock:
+        return (
+            select(
+                Estoque.id_produtos,
+                Produto.nome,
+                Produto.categoria,
+                Estoque.quantidade_disponivel,
+                Estoque.custo_medio,
+                Estoque.estoque_ideal,
+                Estoque.updated_at,
+            )
+            .join(Produto, Produto.id == Estoque.id_produtos)
+            .where(Estoque.id_empresas == current_user.id_empresas)
+            .order_by(Estoque.id_produtos)
+        )
+
+    statement = (
+        select(
+            MovimentacoesEstoque.id,
+            MovimentacoesEstoque.id_produtos,
+            # Rótulo do enum direto do banco, sem conversão linha a linha
+            cast(MovimentacoesEstoque.tipo, String).label("tipo"),
+            MovimentacoesEstoque.quantidade,
+            MovimentacoesEstoque.preco_und,
+            MovimentacoesEstoque.total,
+            MovimentacoesEstoque.date,
+            MovimentacoesEstoque.updated_at,
+        )
+        .join(Produto, Produto.id == MovimentacoesEstoque.id_produtos)
+        .where(Produto.id_empresas == current_user.id_empresas)
+        # Ordem de inserção: a reimportação recalcula o custo médio igual
+        .order_by(MovimentacoesEstoque.id)
+    )
+    if date_from is not None:
+        statement = statement.where(MovimentacoesEstoque.date >= date_from)
+    if date_to is not None:
+        statement = statement.where(MovimentacoesEstoque.date < date_to)
+    return statement
+
+
+async def iter_export_partitions(
+    statement, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[list]:
+    """Rows come from a server-side cursor ``chunk_size`` at a time, in a
+    session of its own because the request session is already closed
+    once the response starts streaming."""
+    async with AsyncSession(engine) as session:
+        result = await session.stream(
+            statement.execution_options(yield_per=chunk_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+
+async def stream_csv(statement, columns: dict) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for partition in iter_export_partitions(statement):
+        writer.writerows(partition)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class ParquetChunkSink:
+    """Write-only file for pyarrow that hands out what was written so far.
+
+    ParquetWriter records offsets with ``tell()``, so the position keeps
+    growing even though the written bytes are dropped on every drain.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self): ...
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def stream_parquet(statement, columns: dict) -> AsyncIterator[bytes]:
+    schema = pa.schema([
+        (name, PARQUET_TYPES[column_type])
+        for name, column_type in columns.items()
+    ])
+    sink = ParquetChunkSink()
+    # Um row group por partição do cursor
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema) as writer:
+        async for partition in iter_export_partitions(statement):
+            writer.write_table(pa.Table.from_arrays(
+                [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(zip(*partition), schema)
+                ],
+                schema=schema,
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_stock_service(
+    current_user: User,
+    format: ExportFormatEnum,
+    dataset: ExportDatasetEnum,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+):
+    statement = build_export_statement(
+        dataset, current_user, date_from, date_to
+    )
+    columns = (
+        STOCK_COLUMNS if dataset == ExportDatasetEnum.stock
+        else MOVIMENTS_COLUMNS
+    )
+    stream = (
+        stream_parquet if format == ExportFormatEnum.parquet else stream_csv
+    )
+    return stream(statement, columns), MEDIA_TYPES[format]
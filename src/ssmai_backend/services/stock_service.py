@@ -1,10 +1,18 @@
+import logging
 from http import HTTPStatus
+from io import BytesIO
 
+import numpy as np
 import pandas as pd
+import psycopg
+import pyarrow as pa
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import and_, join, select
+from pyarrow import csv as pa_csv
+from sqlalchemy import and_, insert, join, select, text
+from sqlalchemy.exc import DataError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ssmai_backend.enums.products_enums import MovementTypesEnum
 from ssmai_backend.models.produto import (
     Empresa,
     Estoque,
@@ -12,12 +20,17 @@ from ssmai_backend.models.produto import (
     Produto,
 )
 from ssmai_backend.models.user import User
-from ssmai_backend.schemas.root_schemas import FilterPage
+from ssmai_backend.pagination import paginate_by_keyset
+from ssmai_backend.schemas.root_schemas import CursorPage, FilterPage
 from ssmai_backend.schemas.stock_schemas import (
+    BatchMovimentModel,
     EntryModel,
     ExitModel,
     MovimentModelResponse,
 )
+from ssmai_backend.services.csv_import import iter_csv_chunks
+
+logger = logging.getLogger(__name__)
 
 
 async def get_stock_by_product_id(
@@ -41,13 +54,6 @@ async def get_stock_by_product_id(
     return stock_db
 
 
-# async def verify_if_products_exists(product_ids: list[int],
-#                                     session: AsyncSession,
-#                                     current_user: User):
-
-#     qtd = session.scalar(select(func.count()).select_from(Produto).where(and_(Estoque.id_produtos == current_user.id_empresas, Produto.id)))
-
-
 async def register_entry_by_id_service(
     product_id: int,
     session: AsyncSession,
@@ -59,6 +65,7 @@ async def register_entry_by_id_service(
     if not batch:
         entry_db = MovimentacoesEstoque(
             id_produtos=product_id,
+            id_empresas=current_user.id_empresas,
             tipo='Entrada',
             quantidade=moviment.quantidade,
             preco_und=moviment.preco_und,
@@ -70,6 +77,7 @@ async def register_entry_by_id_service(
     else:
         entry_db = MovimentacoesEstoque(
             id_produtos=product_id,
+            id_empresas=current_user.id_empresas,
             tipo='Entrada',
             quantidade=moviment.quantidade,
             preco_und=moviment.preco_und,
@@ -83,6 +91,29 @@ async def register_entry_by_id_service(
     return entry_db
 
 
+# Débito condicional e saída no mesmo statement: o lock da linha de estoque
+# serializa saídas concorrentes e a checagem é refeita depois da espera
+REGISTER_EXIT = """
+    WITH baixa AS (
+        UPDATE estoque
+        SET quantidade_disponivel = quantidade_disponivel - :quantidade,
+            updated_at = NOW()
+        WHERE id_produtos = :id_produtos
+          AND id_empresas = :id_empresas
+          AND quantidade_disponivel >= :quantidade
+        RETURNING id_produtos, id_empresas, custo_medio
+    )
+    INSERT INTO movimentacoes_estoque (
+        id_produtos, id_empresas, tipo, quantidade, preco_und, total
+    )
+    SELECT id_produtos, id_empresas, 'saida', :quantidade, custo_medio,
+           custo_medio * :quantidade
+    FROM baixa
+    RETURNING id, id_produtos, id_empresas, tipo, quantidade, preco_und,
+              total, date, updated_at
+"""
+
+
 async def register_exit_by_id_service(
     product_id: int,
     session: AsyncSession,
@@ -90,24 +121,34 @@ async def register_exit_by_id_service(
     current_user: User,
     batch: bool = False
 ):
-    stock_db = await get_stock_by_product_id(product_id, session, current_user)
     if not batch:
-        if stock_db.quantidade_disponivel < moviment.quantidade:
+        # O estoque já sai debitado pelo statement: tr_controle não reaplica
+        await session.execute(
+            text("SELECT set_config('ssmai.modo_estoque', 'baixa', true)")
+        )
+        exit_db = (await session.execute(
+            text(REGISTER_EXIT).columns(
+                *MovimentacoesEstoque.__table__.c
+            ),
+            {
+                "id_produtos": product_id,
+                "id_empresas": current_user.id_empresas,
+                "quantidade": moviment.quantidade,
+            },
+        )).first()
+        if exit_db is None:
+            await session.rollback()
+            await get_stock_by_product_id(product_id, session, current_user)
             raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
                                 detail='Quantity unavailable')
-        exit_db = MovimentacoesEstoque(
-            id_produtos=product_id,
-            tipo='Saida',
-            quantidade=moviment.quantidade,
-            preco_und=stock_db.custo_medio,
-            total=stock_db.custo_medio * moviment.quantidade
-        )
-        session.add(exit_db)
         await session.commit()
-        await session.refresh(exit_db)
     else:
+        stock_db = await get_stock_by_product_id(
+            product_id, session, current_user
+        )
         exit_db = MovimentacoesEstoque(
             id_produtos=product_id,
+            id_empresas=current_user.id_empresas,
             tipo='Saida',
             quantidade=moviment.quantidade,
             preco_und=stock_db.custo_medio,
@@ -136,23 +177,22 @@ async def get_moviments_by_product_id_service(
 async def get_moviments_by_product_id_user_enterpryse_service(
     product_id: int,
     session: AsyncSession,
-    filter: FilterPage,
+    page: CursorPage,
     current_user: User
 ):
     statement = (
         select(MovimentacoesEstoque)
-        .select_from(
-            join(MovimentacoesEstoque, Produto, MovimentacoesEstoque.id_produtos == Produto.id)
-            .join(Empresa, Produto.id_empresas == Empresa.id)
-        )
+        .join(Produto, MovimentacoesEstoque.id_produtos == Produto.id)
         .where(
-            and_(Empresa.id == current_user.id_empresas,
+            and_(Produto.id_empresas == current_user.id_empresas,
                  MovimentacoesEstoque.id_produtos == product_id)
             )
-        .limit(filter.limit).offset(filter.offset)
     )
-    result = await session.execute(statement)
-    return result.scalars().all()
+    moviments, next_cursor = await paginate_by_keyset(
+        session, statement,
+        MovimentacoesEstoque.date, MovimentacoesEstoque.id, page
+    )
+    return {"products": moviments, "next_cursor": next_cursor}
 
 
 async def get_all_moviments_service(
@@ -166,20 +206,17 @@ async def get_all_moviments_service(
 
 async def get_all_moviments_by_enterpryse_user_service(
     session: AsyncSession,
-    filter: FilterPage,
+    page: CursorPage,
     current_user: User
 ):
-    statement = (
-        select(MovimentacoesEstoque)
-        .select_from(
-            join(MovimentacoesEstoque, Produto, MovimentacoesEstoque.id_produtos == Produto.id)
-            .join(Empresa, Produto.id_empresas == Empresa.id)
-        )
-        .where(Empresa.id == current_user.id_empresas)
-        .limit(filter.limit).offset(filter.offset)
+    statement = select(MovimentacoesEstoque).where(
+        MovimentacoesEstoque.id_empresas == current_user.id_empresas
     )
-    result = await session.execute(statement)
-    return result.scalars().all()
+    moviments, next_cursor = await paginate_by_keyset(
+        session, statement,
+        MovimentacoesEstoque.date, MovimentacoesEstoque.id, page
+    )
+    return {"products": moviments, "next_cursor": next_cursor}
 
 
 async def get_stock_by_product_id_service(
@@ -221,68 +258,328 @@ async def get_all_stock_by_user_enterpryse_service(
     return result.scalars().all()
 
 
+STAGING_MOVIMENTS_TABLE = """
+    CREATE TEMP TABLE movimentacoes_staging (
+        ordem BIGINT GENERATED ALWAYS AS IDENTITY,
+        id_produtos INTEGER NOT NULL,
+        tipo movementtypesenum NOT NULL,
+        quantidade INTEGER NOT NULL,
+        preco_und FLOAT NOT NULL,
+        total FLOAT NOT NULL,
+        date TIMESTAMP,
+        updated_at TIMESTAMP
+    ) ON COMMIT DROP
+"""
+
+STAGING_MOVIMENTS_COLUMNS = [
+    "id_produtos", "tipo", "quantidade", "preco_und", "total", "date",
+    "updated_at"
+]
+
+COPY_STAGED_MOVIMENTS = (
+    "COPY movimentacoes_staging "
+    f"({', '.join(STAGING_MOVIMENTS_COLUMNS)}) FROM STDIN (FORMAT csv)"
+)
+
+INSERT_STAGED_MOVIMENTS = """
+    INSERT INTO movimentacoes_estoque (
+        id_produtos, id_empresas, tipo, quantidade, preco_und, total, date,
+        updated_at
+    )
+    SELECT id_produtos, :id_empresas, tipo, quantidade, preco_und, total,
+           COALESCE(date, NOW()), COALESCE(updated_at, NOW())
+    FROM movimentacoes_staging
+    ORDER BY ordem
+"""
+
+
+async def lock_stocks_by_product_ids(
+    product_ids: list[int],
+    session: AsyncSession,
+    current_user: User,
+    missing_ok: bool = False
+) -> dict[int, list]:
+    # Lock em ordem de produto para cargas concorrentes não se travarem
+    result = await session.execute(
+        select(
+            Estoque.id_produtos,
+            Estoque.quantidade_disponivel,
+            Estoque.custo_medio
+        )
+        .where(
+            Estoque.id_empresas == current_user.id_empresas,
+            Estoque.id_produtos.in_(product_ids)
+        )
+        .order_by(Estoque.id_produtos)
+        .with_for_update()
+    )
+    stocks = {
+        product_id: [quantidade, custo_medio]
+        for product_id, quantidade, custo_medio in result
+    }
+    if not missing_ok and len(stocks) != len(product_ids):
+        raise HTTPException(
+            HTTPStatus.NOT_FOUND,
+            detail="Product not found!"
+        )
+    return stocks
+
+
+def scan_affine_maps(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Inclusive prefix scan of the maps ``x -> a * x + b`` applied in
+    order; returns the offsets, which are the values when the first map of
+    each run has ``a == 0``."""
+    a, b = a.copy(), b.copy()
+    step = 1
+    while step < len(a):
+        a[step:], b[step:] = (
+            a[step:] * a[:-step], a[step:] * b[:-step] + b[step:]
+        )
+        step *= 2
+    return b
+
+
+def replay_average_cost(
+    product_ids: np.ndarray,
+    entradas: np.ndarray,
+    quantidades: np.ndarray,
+    precos: np.ndarray,
+    stocks: dict[int, list]
+) -> np.ndarray:
+    """Average cost after each row, for rows grouped by product and in
+    file order within each product; leaves ``stocks`` at the final state.
+
+    Every row is an affine map of the average cost (exits keep it), so the
+    replay is a prefix scan instead of a loop over rows."""
+    inicios = np.r_[True, product_ids[1:] != product_ids[:-1]]
+    estoque_inicial, custo_inicial = np.array(
+        [stocks[product_id] for product_id in product_ids[inicios]],
+        dtype=float
+    ).T
+
+    # Saldo depois de cada linha, acumulado por produto
+    delta = np.where(entradas, quantidades, -quantidades)
+    saldo_depois = np.cumsum(delta)
+    saldo_depois += np.repeat(
+        estoque_inicial - (saldo_depois - delta)[inicios],
+        np.diff(np.r_[np.flatnonzero(inicios), len(delta)])
+    )
+
+    # Entrada: c' = (saldo_antes * c + preco * qtd) / saldo_depois
+    atualiza = entradas & (saldo_depois != 0)
+    a = np.divide(
+        saldo_depois - delta, saldo_depois,
+        out=np.ones_like(saldo_depois), where=atualiza
+    )
+    b = np.divide(
+        precos * quantidades, saldo_depois,
+        out=np.zeros_like(saldo_depois), where=atualiza
+    )
+    b[inicios] += a[inicios] * custo_inicial
+    a[inicios] = 0.0
+    custos = scan_affine_maps(a, b)
+
+    fins = np.r_[inicios[1:], True]
+    stocks.update({
+        product_id: [round(quantidade), custo]
+        for product_id, quantidade, custo in zip(
+            product_ids[fins].tolist(),
+            saldo_depois[fins].tolist(),
+            custos[fins].tolist()
+        )
+    })
+    return custos
+
+
+def price_moviments_chunk(df_chunk: pd.DataFrame, stocks: dict[int, list]):
+    """Replays fn_controle_movimentacoes in file order so exits get the
+    average cost in force at that point, as the per-row path does."""
+    order = np.argsort(df_chunk["id_produtos"].to_numpy(), kind="stable")
+    entradas = (df_chunk["tipo"] == "entrada").to_numpy()[order]
+    precos = df_chunk["preco_und"].to_numpy(dtype=float)[order]
+    custos = replay_average_cost(
+        df_chunk["id_produtos"].to_numpy()[order],
+        entradas,
+        df_chunk["quantidade"].to_numpy(dtype=float)[order],
+        precos,
+        stocks
+    )
+
+    precos_arquivo = np.empty_like(precos)
+    precos_arquivo[order] = np.where(entradas, precos, custos)
+    df_chunk["preco_und"] = precos_arquivo
+    df_chunk["total"] = precos_arquivo * df_chunk["quantidade"].to_numpy()
+
+
+def moviments_chunk_to_csv(df_chunk: pd.DataFrame) -> bytes:
+    """Serializes a chunk for COPY ... (FORMAT csv); pyarrow's writer is
+    an order of magnitude faster than ``DataFrame.to_csv`` here."""
+    buffer = BytesIO()
+    pa_csv.write_csv(
+        pa.Table.from_pandas(
+            df_chunk[STAGING_MOVIMENTS_COLUMNS], preserve_index=False
+        ),
+        buffer,
+        pa_csv.WriteOptions(include_header=False)
+    )
+    return buffer.getvalue()
+
+
+async def copy_moviments_to_staging(
+    session: AsyncSession,
+    current_user: User,
+    csv_file: UploadFile
+):
+    required_columns = {
+        "id", "id_produtos", "tipo", "quantidade", "preco_und", "total",
+        "date", "updated_at"
+    }
+    stocks = {}
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async for df_chunk in iter_csv_chunks(csv_file, required_columns):
+            df_chunk["tipo"] = df_chunk["tipo"].str.lower()
+            if not df_chunk["tipo"].isin(("entrada", "saida")).all():
+                raise HTTPException(
+                    status_code=HTTPStatus.CONFLICT,
+                    detail='Saida, Entrada ou Outro'
+                )
+
+            new_product_ids = [
+                int(product_id)
+                for product_id in df_chunk["id_produtos"].unique()
+                if product_id not in stocks
+            ]
+            if new_product_ids:
+                stocks.update(await lock_stocks_by_product_ids(
+                    new_product_ids, session, current_user
+                ))
+            price_moviments_chunk(df_chunk, stocks)
+
+            async with cursor.copy(COPY_STAGED_MOVIMENTS) as copy:
+                await copy.write(moviments_chunk_to_csv(df_chunk))
+
+
 async def insert_moviments_with_csv_service(
     session: AsyncSession,
     current_user: User,
     csv_file: UploadFile
 ):
-    if not csv_file.filename.endswith(".csv"):
+    try:
+        await session.execute(
+            text("SELECT set_config('ssmai.modo_estoque', 'lote', true)")
+        )
+        await session.execute(text(STAGING_MOVIMENTS_TABLE))
+        await copy_moviments_to_staging(session, current_user, csv_file)
+
+        # tr_movimentacoes_lote consolida estoque e diário do statement todo
+        await session.execute(
+            text(INSERT_STAGED_MOVIMENTS),
+            {"id_empresas": current_user.id_empresas}
+        )
+        await session.commit()
+    except HTTPException:
+        await session.rollback()
+        raise
+    except (DataError, psycopg.DataError) as e:
+        await session.rollback()
+        error = getattr(e, "orig", e)
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
-            detail="Unexpected format"
+            detail=f"Invalid value in CSV: {str(error).splitlines()[0]}"
         )
-    contents = await csv_file.read()
-    try:
-        df_moviments = pd.read_csv(pd.io.common.BytesIO(contents))
     except Exception:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail="Unable to read CSV"
+        await session.rollback()
+        logger.exception(
+            "CSV moviments import failed for company %s",
+            current_user.id_empresas
         )
-    required_columns = {"id", "id_produtos", "tipo", "quantidade", "preco_und", "total", "date", "updated_at"}
-    if not required_columns.issubset(df_moviments.columns):
         raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail=f"CSV deve conter as colunas: {', '.join(required_columns)}"
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail="Unable to import moviments"
         )
-    try:
-        for _, row in df_moviments.iterrows():
-            tipo = row["tipo"]
-            product_id = row["id_produtos"]
-            if tipo in ("Entrada", "entrada"):
-                moviment = MovimentModelResponse(
-                    id=row["id"],
-                    id_produtos=row['id_produtos'],
-                    tipo='Entrada',
-                    quantidade=row["quantidade"],
-                    preco_und=row["preco_und"],
-                    total=row['total'],
-                    date=row['date'],
-                    updated_at=row['updated_at']
-                )
-                await register_entry_by_id_service(product_id, session, moviment, current_user, batch=True)
-            elif tipo in ("Saida", 'saida'):
-                moviment = MovimentModelResponse(
-                    id=row["id"],
-                    id_produtos=row['id_produtos'],
-                    tipo='Saida',
-                    quantidade=row["quantidade"],
-                    preco_und=row["preco_und"],
-                    total=row['total'],
-                    date=row['date'],
-                    updated_at=row['updated_at']
-                )
-                await register_exit_by_id_service(product_id, session, moviment, current_user, batch=True)
-            else:
-                print(row["id"], row['id_produtos'])
-                raise HTTPException(status_code=HTTPStatus.CONFLICT, detail='Saida, Entrada ou Outro')
-        await session.commit()
-        print('alow')
-    except Exception as e:
-        await session.rollback()
-        print(type(e))
-        print(e)
-        print('aloo')
-        raise HTTPException(status_code=500, detail='Fail')
 
     return {'message': 'success'}
+
+
+async def register_moviments_batch_service(
+    moviments: list[BatchMovimentModel],
+    session: AsyncSession,
+    current_user: User
+):
+    stocks = await lock_stocks_by_product_ids(
+        list({moviment.id_produtos for moviment in moviments}),
+        session, current_user, missing_ok=True
+    )
+
+    results = []
+    rows = []
+    for index, moviment in enumerate(moviments):
+        result = {"index": index, "id_produtos": moviment.id_produtos}
+        results.append(result)
+        stock = stocks.get(moviment.id_produtos)
+        if stock is None:
+            result["detail"] = "Product not found!"
+        elif moviment.quantidade <= 0:
+            # Saída negativa passaria na checagem e aumentaria o estoque
+            result["detail"] = "Quantity must be positive"
+        elif moviment.tipo == MovementTypesEnum.entrada:
+            if moviment.preco_und is None:
+                result["detail"] = "Entry without preco_und"
+                continue
+            novo_estoque = stock[0] + moviment.quantidade
+            if novo_estoque:
+                stock[1] = (
+                    stock[0] * stock[1]
+                    + moviment.preco_und * moviment.quantidade
+                ) / novo_estoque
+            stock[0] = novo_estoque
+            rows.append((result, moviment, moviment.preco_und))
+        elif moviment.tipo == MovementTypesEnum.saida:
+            if stock[0] < moviment.quantidade:
+                result["detail"] = "Quantity unavailable"
+                continue
+            # Saída sai pelo custo médio vigente, como no trigger por linha
+            stock[0] -= moviment.quantidade
+            rows.append((result, moviment, stock[1]))
+        else:
+            result["detail"] = "Saida ou Entrada"
+
+    if rows:
+        try:
+            # tr_movimentacoes_lote aplica estoque e diário uma vez só
+            await session.execute(
+                text("SELECT set_config('ssmai.modo_estoque', 'lote', true)")
+            )
+            inserted = await session.scalars(
+                insert(MovimentacoesEstoque).returning(
+                    MovimentacoesEstoque, sort_by_parameter_order=True
+                ),
+                [
+                    {
+                        "id_produtos": moviment.id_produtos,
+                        "id_empresas": current_user.id_empresas,
+                        "tipo": moviment.tipo,
+                        "quantidade": moviment.quantidade,
+                        "preco_und": preco_und,
+                        "total": preco_und * moviment.quantidade,
+                    }
+                    for _, moviment, preco_und in rows
+                ],
+            )
+            for (result, _, _), moviment_db in zip(rows, inserted.all()):
+                result["moviment"] = moviment_db
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            logger.exception(
+                "Moviments batch failed for company %s",
+                current_user.id_empresas
+            )
+            raise HTTPException(
+                status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                detail="Unable to register moviments"
+            )
+
+    return {"results": results}
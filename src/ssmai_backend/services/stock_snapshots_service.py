@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy import and_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ssmai_backend.database import engine
+from ssmai_backend.enums.products_enums import MovementTypesEnum
+from ssmai_backend.models.produto import (
+    Estoque,
+    EstoqueSnapshot,
+    MovimentacoesEstoque,
+    Produto,
+)
+from ssmai_backend.models.user import User
+from ssmai_backend.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_snapshot_tasks: list[asyncio.Task] = []
+
+
+def replay_moviments_forward(quantidade, custo_medio, moviments):
+    """Apply movements after a snapshot, the same way the stock trigger does"""
+    for tipo, moviment_quantity, total in moviments:
+        if tipo == MovementTypesEnum.entrada:
+            # Mesmo CASE do trigger: estoque zerado mantém o custo médio
+            if quantidade + moviment_quantity != 0:
+                custo_medio = (
+                    (quantidade * custo_medio + total)
+                    / (quantidade + moviment_quantity)
+                )
+            quantidade += moviment_quantity
+        elif tipo == MovementTypesEnum.saida:
+            quantidade -= moviment_quantity
+    return quantidade, custo_medio
+
+
+def replay_moviments_backward(quantidade, custo_medio, moviments):
+    """Undo movements newest first, starting from a later known state"""
+    for tipo, moviment_quantity, total in moviments:
+        if tipo == MovementTypesEnum.entrada:
+            previous_quantity = quantidade - moviment_quantity
+            if previous_quantity > 0:
+                custo_medio = (
+                    (quantidade * custo_medio - total) / previous_quantity
+                )
+            quantidade = previous_quantity
+        elif tipo == MovementTypesEnum.saida:
+            quantidade += moviment_quantity
+    return quantidade, custo_medio
+
+
+async def get_stock_at_date_service(
+    product_id: int,
+    at: date,
+    session: AsyncSession,
+    current_user: User,
+):
+    product = await session.scalar(
+        select(Produto).where(Produto.id == product_id)
+    )
+
+    if not product or (product.id_empresas != current_user.id_empresas):
+        raise HTTPException(
+            HTTPStatus.NOT_FOUND,
+            detail="Product not found!"
+        )
+
+    end_of_day = datetime.combine(at + timedelta(days=1), time.min)
+
+    # Snapshot e delta na mesma consulta para enxergarem o mesmo estado
+    snapshot = (
+        select(EstoqueSnapshot)
+        .where(
+            EstoqueSnapshot.id_produtos == product_id,
+            EstoqueSnapshot.capturado_em < end_of_day,
+        )
+        .order_by(EstoqueSnapshot.capturado_em.desc())
+        .limit(1)
+        .cte("snapshot")
+    )
+    rows = (await session.execute(
+        select(
+            snapshot.c.quantidade_disponivel,
+            snapshot.c.custo_medio,
+            snapshot.c.capturado_em,
+            MovimentacoesEstoque.tipo,
+            MovimentacoesEstoque.quantidade,
+            MovimentacoesEstoque.total,
+        )
+        .select_from(snapshot)
+        .outerjoin(
+            MovimentacoesEstoque,
+            and_(
+                MovimentacoesEstoque.id_produtos == product_id,
+                MovimentacoesEstoque.date > snapshot.c.capturado_em,
+                MovimentacoesEstoque.date < end_of_day,
+            ),
+        )
+        # O trigger aplica na ordem de inserção, não na ordem de date
+        .order_by(MovimentacoesEstoque.id)
+    )).all()
+
+    if rows:
+        quantidade, custo_medio, snapshot_at = rows[0][:3]
+        moviments = [row[3:] for row in rows if row.tipo is not None]
+        quantidade, custo_medio = replay_moviments_forward(
+            quantidade, custo_medio, moviments
+        )
+    else:
+        # Sem snapshot anterior à data: desfaz a partir do estoque atual
+        rows = (await session.execute(
+            select(
+                Estoque.quantidade_disponivel,
+                Estoque.custo_medio,
+                MovimentacoesEstoque.tipo,
+                MovimentacoesEstoque.quantidade,
+                MovimentacoesEstoque.total,
+            )
+            .outerjoin(
+                MovimentacoesEstoque,
+                and_(
+                    MovimentacoesEstoque.id_produtos == Estoque.id_produtos,
+                    MovimentacoesEstoque.date >= end_of_day,
+                ),
+            )
+            .where(Estoque.id_produtos == product_id)
+            .order_by(MovimentacoesEstoque.id.desc())
+        )).all()
+        if not rows:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail="Stock not found"
+            )
+        quantidade, custo_medio = rows[0][:2]
+        snapshot_at = None
+        moviments = [row[2:] for row in rows if row.tipo is not None]
+        quantidade, custo_medio = replay_moviments_backward(
+            quantidade, custo_medio, moviments
+        )
+
+    return {
+        "id_produtos": product_id,
+        "data": at,
+        "quantidade_disponivel": quantidade,
+        "custo_medio": custo_medio,
+        "snapshot_em": snapshot_at,
+        "movimentacoes_aplicadas": len(moviments),
+    }
+
+
+async def capture_stock_snapshots() -> int:
+    async with AsyncSession(engine) as session:
+        captured = await session.scalar(
+            text("SELECT fn_capturar_snapshots_estoque()")
+        )
+        await session.commit()
+    return captured
+
+
+async def stock_snapshots_worker():
+    interval = Settings().STOCK_SNAPSHOT_INTERVAL_SECONDS
+    while True:
+        try:
+            await capture_stock_snapshots()
+        except Exception:
+            logger.exception("Failed to capture stock snapshots")
+        await asyncio.sleep(interval)
+
+
+def start_stock_snapshots():
+    _snapshot_tasks.append(asyncio.create_task(stock_snapshots_worker()))
+
+
+async def stop_stock_snapshots():
+    for task in _snapshot_tasks:
+        task.cancel()
+    await asyncio.gather(*_snapshot_tasks, return_exceptions=True)
+    _snapshot_tasks.clear()
@@ -1,5 +1,10 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from ssmai_backend.enums.ai_analysis_enums import (
+    ForecastEngineEnum,
+    GraphCacheBackendEnum,
+)
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -22,3 +27,20 @@ class Settings(BaseSettings):
     BEDROCK_AWS_ACCESS_KEY_ID: str
     BEDROCK_AWS_SECRET_ACCESS_KEY: str
     CLOUDE_INFERENCE_PROFILE: str
+
+    FORECAST_MAX_WORKERS: int | None = None
+    FORECAST_ENGINE: ForecastEngineEnum = ForecastEngineEnum.prophet
+    FORECAST_HORIZON_ONLY: bool = False
+    FORECAST_JOB_WORKERS: int = 1
+    FORECAST_JOB_POLL_SECONDS: float = 2.0
+    FORECAST_JOB_STALE_SECONDS: int = 600
+    FORECAST_JOB_HEARTBEAT_SECONDS: float = 30.0
+
+    GRAPH_CACHE_BACKEND: GraphCacheBackendEnum = GraphCacheBackendEnum.memory
+    GRAPH_CACHE_TTL_SECONDS: int = 3600
+    GRAPH_CACHE_MAX_ITEMS: int = 1024
+
+    MOVIMENTS_PARTITIONS_AHEAD: int = 3
+    MOVIMENTS_PARTITIONS_INTERVAL_SECONDS: int = 86400
+
+    STOCK_SNAPSHOT_INTERVAL_SECONDS: int = 86400
@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select
+
+from ssmai_backend.models.produto import (
+    Empresa,
+    Estoque,
+    MovimentacoesDiarias,
+    MovimentacoesResumo,
+    PrevisoesFingerprint,
+    Produto,
+)
+from ssmai_backend.services import ai_analysis_service
+from ssmai_backend.services.ai_analysis_service import (
+    refresh_enterpryse_forecasts,
+)
+from ssmai_backend.services.forecast_engine import (
+    BROKEN_WORKER_MESSAGE,
+    INSUFFICIENT_DATA_MESSAGE,
+    CrostonForecaster,
+)
+
+DAYS = 10
+FORECASTED = 1
+WORKER_CRASH = 2
+INSUFFICIENT_DATA = 3
+WITHOUT_STOCK = 4
+
+
+@pytest_asyncio.fixture
+async def forecast_session(session):
+    await session.execute(insert(Empresa), [
+        {"nome": "Empresa A", "ramo": "varejo"},
+    ])
+    product_ids = [FORECASTED, WORKER_CRASH, INSUFFICIENT_DATA, WITHOUT_STOCK]
+    await session.execute(insert(Produto), [
+        {"id_empresas": 1, "nome": f"Produto {i}", "categoria": "Geral"}
+        for i in product_ids
+    ])
+    await session.execute(insert(Estoque), [
+        {
+            "id_produtos": product_id,
+            "id_empresas": 1,
+            "quantidade_disponivel": 100,
+            "custo_medio": 5.0,
+        }
+        for product_id in product_ids if product_id != WITHOUT_STOCK
+    ])
+    await session.execute(insert(MovimentacoesDiarias), [
+        {
+            "id_produtos": product_id,
+            "data": date(2025, 9, 1) + timedelta(days=day),
+            "quantidade_entrada": 0,
+            "quantidade_saida": day % 3,
+            "valor_total": 5.0 * (day % 3),
+            "soma_preco_und": 5.0,
+            "total_movimentacoes": 1,
+        }
+        for product_id in product_ids
+        for day in range(DAYS)
+    ])
+    # Resumo mantido pelo trigger nas migrations; aqui vai direto
+    await session.execute(insert(MovimentacoesResumo), [
+        {
+            "id_produtos": product_id,
+            "ultima_movimentacao_id": product_id,
+            "ultima_movimentacao_em": datetime(2025, 9, DAYS),
+            "total_movimentacoes": DAYS,
+            "soma_quantidade": DAYS,
+        }
+        for product_id in product_ids
+    ])
+    await session.commit()
+    return session
+
+
+@pytest.fixture
+def forecaster_calls(monkeypatch):
+    calls = []
+
+    class FakeForecaster(CrostonForecaster):
+        async def forecast(self, frames, progress=None):
+            calls.append(set(frames))
+            forecasts, _ = await super().forecast(frames)
+            failures = {
+                WORKER_CRASH: BROKEN_WORKER_MESSAGE,
+                INSUFFICIENT_DATA: INSUFFICIENT_DATA_MESSAGE,
+            }
+            # O worker só cai na primeira execução
+            if len(calls) > 1:
+                failures.pop(WORKER_CRASH)
+            for product_id in failures:
+                forecasts.pop(product_id, None)
+            return forecasts, {
+                product_id: error
+                for product_id, error in failures.items()
+                if product_id in frames
+            }
+
+    monkeypatch.setattr(
+        ai_analysis_service, "get_forecaster", lambda engine: FakeForecaster()
+    )
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_on_next_run(
+    forecast_session, forecaster_calls
+):
+    first = await refresh_enterpryse_forecasts(forecast_session, 1)
+    stored = await forecast_session.scalars(
+        select(PrevisoesFingerprint.id_produtos)
+    )
+
+    assert first == {
+        "message": "Coleta realizada",
+        "refreshed": 1,
+        "skipped": 0,
+        "failed": 3,
+    }
+    # Sem estoque e worker derrubado não são definitivos
+    assert set(stored) == {FORECASTED, INSUFFICIENT_DATA}
+
+    second = await refresh_enterpryse_forecasts(forecast_session, 1)
+
+    assert forecaster_calls[-1] == {WORKER_CRASH}
+    assert second == {
+        "message": "Coleta realizada",
+        "refreshed": 1,
+        "skipped": 2,
+        "failed": 1,
+    }
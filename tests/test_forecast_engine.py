@@ -0,0 +1,130 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pytest
+
+from ssmai_backend.services import forecast_engine
+from ssmai_backend.services.forecast_engine import (
+    BROKEN_WORKER_MESSAGE,
+    FORECAST_HORIZON,
+    CrostonForecaster,
+    run_forecasts,
+)
+
+
+def _frame(values, start="2025-09-01"):
+    return pd.DataFrame({
+        "ds": pd.date_range(start, periods=len(values), freq="D"),
+        "y": values,
+    })
+
+
+@pytest.mark.asyncio
+async def test_croston_forecaster_keeps_horizon_and_upper_band():
+    frames = {
+        1: _frame([0, 3, 0, 0, 4, 0, 5, 0]),
+        2: _frame([2, 2, 2], start="2025-09-10"),
+    }
+
+    forecasts, failures = await CrostonForecaster().forecast(frames)
+
+    assert failures == {}
+    for product_id, frame in frames.items():
+        df_forecast = forecasts[product_id]
+        assert len(df_forecast) == len(frame) + FORECAST_HORIZON
+        assert df_forecast["ds"].iloc[-1] == (
+            frame["ds"].iloc[-1] + pd.Timedelta(days=FORECAST_HORIZON)
+        )
+        assert (df_forecast["yhat_upper"] >= df_forecast["yhat"]).all()
+
+
+@pytest.mark.asyncio
+async def test_croston_forecaster_constant_demand():
+    forecasts, _ = await CrostonForecaster(alpha=0.1).forecast(
+        {1: _frame([2] * 10)}
+    )
+
+    future = forecasts[1].tail(FORECAST_HORIZON)
+    assert future["yhat"].round(6).tolist() == [0.95 * 2] * FORECAST_HORIZON
+
+
+@pytest.mark.asyncio
+async def test_croston_forecaster_rejects_products_without_demand():
+    forecasts, failures = await CrostonForecaster().forecast(
+        {1: _frame([0, 0, 0]), 2: _frame([5])}
+    )
+
+    assert forecasts == {}
+    assert set(failures) == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_broken_worker_only_fails_its_own_product(monkeypatch):
+    frames = {product_id: _frame([product_id] * 3) for product_id in (1, 2, 3)}
+    crashing_product = 2
+    in_flight = set()
+    pool_broken = asyncio.Event()
+
+    async def fake_run_forecast(df_to_prophet):
+        # Um produto derruba o worker e, com ele, tudo que está no pool
+        product_id = int(df_to_prophet["y"].iloc[0])
+        in_flight.add(product_id)
+        await asyncio.sleep(0)
+        if product_id == crashing_product:
+            pool_broken.set()
+        await asyncio.sleep(0)
+        in_flight.discard(product_id)
+        if pool_broken.is_set():
+            if not in_flight:
+                pool_broken.clear()
+            raise BrokenProcessPool
+        return df_to_prophet
+
+    async def fake_warm_up():
+        pass
+
+    monkeypatch.setattr(forecast_engine, "run_forecast", fake_run_forecast)
+    monkeypatch.setattr(forecast_engine, "warm_up_forecast_pool", fake_warm_up)
+    progress = []
+
+    async def on_progress(product_id, error):
+        progress.append(product_id)
+
+    forecasts, failures = await run_forecasts(frames, on_progress)
+
+    assert set(forecasts) == {1, 3}
+    assert failures == {crashing_product: BROKEN_WORKER_MESSAGE}
+    assert sorted(progress) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_retried_concurrently_on_warm_pool(monkeypatch):
+    frames = {product_id: _frame([product_id] * 3) for product_id in range(4)}
+    pool = {"warm": False}
+    in_flight = set()
+    concurrency = []
+
+    async def fake_run_forecast(df_to_prophet):
+        # O primeiro pool quebra; o novo, já aquecido, atende todos
+        product_id = int(df_to_prophet["y"].iloc[0])
+        await asyncio.sleep(0)
+        if not pool["warm"]:
+            raise BrokenProcessPool
+        in_flight.add(product_id)
+        await asyncio.sleep(0)
+        concurrency.append(len(in_flight))
+        in_flight.discard(product_id)
+        return df_to_prophet
+
+    async def fake_warm_up():
+        pool["warm"] = True
+
+    monkeypatch.setattr(forecast_engine, "run_forecast", fake_run_forecast)
+    monkeypatch.setattr(forecast_engine, "warm_up_forecast_pool", fake_warm_up)
+
+    forecasts, failures = await run_forecasts(frames)
+
+    assert failures == {}
+    assert set(forecasts) == set(frames)
+    assert max(concurrency) == len(frames)
@@ -0,0 +1,134 @@
+import asyncio
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import insert, select, text, update
+
+from ssmai_backend.enums.ai_analysis_enums import ForecastJobStatusEnum
+from ssmai_backend.models.forecast_job import ForecastJob
+from ssmai_backend.models.produto import Empresa
+from ssmai_backend.services import forecast_jobs_service
+from ssmai_backend.services.forecast_jobs_service import (
+    ForecastJobTracker,
+    claim_next_forecast_job,
+    enqueue_forecast_job_service,
+)
+
+user_a = SimpleNamespace(id=1, id_empresas=1)
+user_b = SimpleNamespace(id=2, id_empresas=2)
+
+
+@pytest_asyncio.fixture
+async def enterprises(session):
+    await session.execute(insert(Empresa), [
+        {"nome": "Empresa A", "ramo": "varejo"},
+        {"nome": "Empresa B", "ramo": "varejo"},
+    ])
+    await session.commit()
+    return session
+
+
+async def _status(session, job_id):
+    return await session.scalar(
+        select(ForecastJob.status)
+        .where(ForecastJob.id == job_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def _age_job(session, job_id, seconds):
+    await session.execute(
+        update(ForecastJob)
+        .where(ForecastJob.id == job_id)
+        .values(updated_at=text(f"now() - interval '{seconds} seconds'"))
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_reuses_active_job_and_upgrades_force(enterprises):
+    session = enterprises
+    first = await enqueue_forecast_job_service(user_a, session)
+    second = await enqueue_forecast_job_service(user_a, session, force=True)
+    other = await enqueue_forecast_job_service(user_b, session)
+
+    assert second["id"] == first["id"]
+    assert not first["force"]
+    assert second["force"]
+    assert other["id"] != first["id"]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_force_conflicts_with_running_job(enterprises):
+    session = enterprises
+    job = await enqueue_forecast_job_service(user_a, session)
+    await claim_next_forecast_job(session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await enqueue_forecast_job_service(user_a, session, force=True)
+
+    assert exc_info.value.status_code == HTTPStatus.CONFLICT
+    # Sem force o job em execução continua sendo devolvido
+    assert (await enqueue_forecast_job_service(user_a, session))["id"] == (
+        job["id"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_takes_queued_jobs_in_order(enterprises):
+    session = enterprises
+    first = await enqueue_forecast_job_service(user_a, session)
+    second = await enqueue_forecast_job_service(user_b, session)
+
+    claimed = [
+        (await claim_next_forecast_job(session)).id,
+        (await claim_next_forecast_job(session)).id,
+    ]
+
+    assert claimed == [first["id"], second["id"]]
+    assert await claim_next_forecast_job(session) is None
+    assert await _status(session, first["id"]) == (
+        ForecastJobStatusEnum.running
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_reclaims_only_stale_running_jobs(
+    enterprises, monkeypatch
+):
+    session = enterprises
+    monkeypatch.setenv("FORECAST_JOB_STALE_SECONDS", "60")
+    stale = await enqueue_forecast_job_service(user_a, session)
+    live = await enqueue_forecast_job_service(user_b, session)
+    await claim_next_forecast_job(session)
+    await claim_next_forecast_job(session)
+
+    await _age_job(session, stale["id"], 120)
+    await _age_job(session, live["id"], 30)
+
+    assert (await claim_next_forecast_job(session)).id == stale["id"]
+    assert await claim_next_forecast_job(session) is None
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_running_job_from_going_stale(
+    enterprises, engine, monkeypatch
+):
+    session = enterprises
+    monkeypatch.setattr(forecast_jobs_service, "engine", engine)
+    monkeypatch.setenv("FORECAST_JOB_STALE_SECONDS", "60")
+    job = await enqueue_forecast_job_service(user_a, session)
+    await claim_next_forecast_job(session)
+    await _age_job(session, job["id"], 120)
+
+    heartbeat = asyncio.create_task(
+        ForecastJobTracker(job["id"]).heartbeat(0.01)
+    )
+    await asyncio.sleep(0.2)
+    heartbeat.cancel()
+    await asyncio.gather(heartbeat, return_exceptions=True)
+
+    assert await claim_next_forecast_job(session) is None
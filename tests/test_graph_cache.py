@@ -0,0 +1,124 @@
+import pandas as pd
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ssmai_backend.models.produto import Empresa, Estoque, Produto
+from ssmai_backend.services import graph_cache
+from ssmai_backend.services.ai_analysis_service import (
+    get_graph_version_service,
+    write_forecasts_bulk,
+)
+from ssmai_backend.services.graph_cache import (
+    MemoryGraphCache,
+    PostgresGraphCache,
+    etag_matches,
+    format_etag,
+)
+
+
+@pytest.mark.asyncio
+async def test_memory_graph_cache_misses_on_new_version():
+    cache = MemoryGraphCache(ttl_seconds=60, max_items=10)
+    await cache.set(1, '"1-10"', {"historico": [], "previsoes": []})
+
+    assert await cache.get(1, '"1-10"') == {"historico": [], "previsoes": []}
+    assert await cache.get(1, '"1-11"') is None
+
+
+@pytest.mark.asyncio
+async def test_memory_graph_cache_evicts_least_recently_used():
+    cache = MemoryGraphCache(ttl_seconds=60, max_items=2)
+    await cache.set(1, "v", {"id": 1})
+    await cache.set(2, "v", {"id": 2})
+    await cache.get(1, "v")
+    await cache.set(3, "v", {"id": 3})
+
+    assert await cache.get(2, "v") is None
+    assert await cache.get(1, "v") == {"id": 1}
+
+
+@pytest.mark.asyncio
+async def test_memory_graph_cache_expires_entries():
+    cache = MemoryGraphCache(ttl_seconds=-1, max_items=2)
+    await cache.set(1, "v", {"id": 1})
+
+    assert await cache.get(1, "v") is None
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        '"1-10"',
+        'W/"1-10"',
+        '"0-1","1-10"',
+        '"0-1", W/"1-10"',
+        "*",
+    ],
+)
+def test_etag_matches_if_none_match(if_none_match):
+    assert etag_matches(if_none_match, "1-10")
+
+
+def test_etag_does_not_match_other_versions():
+    assert format_etag("1-10") == '"1-10"'
+    assert not etag_matches('"1-11", W/"2-10"', "1-10")
+
+
+@pytest.mark.asyncio
+async def test_postgres_graph_cache_replaces_old_version(
+    session, engine, monkeypatch
+):
+    monkeypatch.setattr(graph_cache, "engine", engine)
+    await session.execute(insert(Empresa).values(nome="A", ramo="varejo"))
+    await session.execute(
+        insert(Produto).values(id_empresas=1, nome="P", categoria="Geral")
+    )
+    await session.commit()
+    cache = PostgresGraphCache(ttl_seconds=60)
+
+    await cache.set(1, "1-10", {"id": 1})
+    assert await cache.get(1, "1-10") == {"id": 1}
+    assert await cache.get(1, "1-11") is None
+
+    await cache.set(1, "1-11", {"id": 2})
+    assert await cache.get(1, "1-10") is None
+    assert await cache.get(1, "1-11") == {"id": 2}
+
+    await PostgresGraphCache(ttl_seconds=-1).set(1, "1-12", {"id": 3})
+    assert await cache.get(1, "1-12") is None
+
+
+def _version_time(version):
+    return float(version.split("-", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_graph_version_follows_forecast_write_order(session, engine):
+    await session.execute(insert(Empresa).values(nome="A", ramo="varejo"))
+    await session.execute(
+        insert(Produto).values(id_empresas=1, nome="P", categoria="Geral")
+    )
+    await session.execute(insert(Estoque).values(
+        id_produtos=1, id_empresas=1, quantidade_disponivel=10, custo_medio=1
+    ))
+    await session.commit()
+    df_forecast = pd.DataFrame({
+        "ds": pd.date_range("2025-09-01", periods=20, freq="D"),
+        "yhat_upper": [2.0] * 20,
+    })
+
+    async with (
+        AsyncSession(engine) as long_job,
+        AsyncSession(engine) as short_job,
+    ):
+        # O job longo abre a transação antes, mas grava depois
+        await long_job.execute(select(func.now()))
+        await write_forecasts_bulk(short_job, {1: df_forecast})
+        await short_job.commit()
+        short_version = await get_graph_version_service(1, session)
+        await write_forecasts_bulk(long_job, {1: df_forecast})
+        await long_job.commit()
+    long_version = await get_graph_version_service(1, session)
+
+    assert _version_time(long_version) > _version_time(short_version)
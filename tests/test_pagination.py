@@ -0,0 +1,20 @@
+from datetime import datetime
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from ssmai_backend.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    date = datetime(2025, 10, 5, 10, 30, 15, 120)
+
+    assert decode_cursor(encode_cursor(date, 42)) == (date, 42)
+
+
+def test_invalid_cursor_is_bad_request():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+
+    assert exc.value.status_code == HTTPStatus.BAD_REQUEST
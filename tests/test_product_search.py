@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+
+from ssmai_backend.enums.products_enums import ProductSearchModeEnum
+from ssmai_backend.models.produto import Empresa, Produto
+from ssmai_backend.services.products_service import search_products_service
+
+current_user = SimpleNamespace(id=1, id_empresas=1)
+
+LIMIT = 10
+PRODUCTS = {
+    1: [
+        ("Parafuso sextavado", "Ferragens"),
+        ("Parafuzo", "Ferragens"),
+        ("Parafusadeira", "Ferramentas"),
+        ("Arruela", "Parafusos e fixação"),
+        ("Porca", "Ferragens"),
+        ("50% off", "Promoção"),
+        ("500 gramas", "Promoção"),
+        ("a_b", "Geral"),
+        ("axb", "Geral"),
+    ],
+    2: [
+        ("Parafuso sextavado", "Ferragens"),
+        ("Parafuso", "Ferragens"),
+        ("50% desconto", "Promoção"),
+        ("a_b outro", "Geral"),
+    ],
+}
+
+
+@pytest_asyncio.fixture
+async def search_session(session):
+    await session.execute(insert(Empresa), [
+        {"nome": "Empresa A", "ramo": "varejo"},
+        {"nome": "Empresa B", "ramo": "varejo"},
+    ])
+    await session.execute(insert(Produto), [
+        {"id_empresas": empresa, "nome": nome, "categoria": categoria}
+        for empresa, products in PRODUCTS.items()
+        for nome, categoria in products
+    ])
+    await session.commit()
+    return session
+
+
+async def _search(session, q, mode):
+    return await search_products_service(
+        q, mode, LIMIT, session, current_user
+    )
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_is_scoped_and_ordered(search_session):
+    rows = await _search(search_session, "PARA", ProductSearchModeEnum.prefix)
+
+    assert [row.nome for row in rows] == [
+        "Parafusadeira",
+        "Parafuso sextavado",
+        "Parafuzo",
+    ]
+    assert {row.id_empresas for row in rows} == {1}
+    assert {row.similaridade for row in rows} == {None}
+
+
+@pytest.mark.parametrize(
+    ("q", "expected"),
+    [
+        ("50%", ["50% off"]),
+        ("A_", ["a_b"]),
+        ("_", []),
+        ("%", []),
+    ],
+)
+@pytest.mark.asyncio
+async def test_prefix_search_escapes_wildcards(search_session, q, expected):
+    rows = await _search(search_session, q, ProductSearchModeEnum.prefix)
+
+    # % e _ do usuário são literais, não curingas do LIKE
+    assert [row.nome for row in rows] == expected
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_ranks_by_similarity(search_session):
+    rows = await _search(
+        search_session, "parafuso", ProductSearchModeEnum.fuzzy
+    )
+
+    # Arruela entra pela categoria; Porca fica abaixo do limiar
+    assert [row.nome for row in rows] == [
+        "Parafuso sextavado",
+        "Arruela",
+        "Parafusadeira",
+        "Parafuzo",
+    ]
+    similaridades = [row.similaridade for row in rows]
+    assert similaridades == sorted(similaridades, reverse=True)
+    assert similaridades[0] == pytest.approx(1.0)
+    assert {row.id_empresas for row in rows} == {1}
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_respects_limit(search_session):
+    rows = await search_products_service(
+        "parafuso",
+        ProductSearchModeEnum.fuzzy,
+        2,
+        search_session,
+        current_user,
+    )
+
+    assert [row.nome for row in rows] == ["Parafuso sextavado", "Arruela"]
@@ -0,0 +1,292 @@
+"""EXPLAIN-based regression checks for the tenant-scoped hot queries.
+
+Each test records the SELECTs a service issues, then EXPLAINs them with
+sequential scans disabled. If a query still needs a ``Seq Scan`` on one of
+the checked tables, no index can serve it.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert, select, text
+
+from ssmai_backend.models.chat_conversation import ChatConversation
+from ssmai_backend.models.produto import (
+    Empresa,
+    Estoque,
+    MovimentacoesEstoque,
+    Previsoes,
+    Produto,
+)
+from ssmai_backend.models.user import User
+from ssmai_backend.schemas.root_schemas import CursorPage, FilterPage
+from ssmai_backend.services.ai_analysis_service import (
+    get_batch_analysis_service,
+    get_worst_stock_deviation_service,
+)
+from ssmai_backend.services.chat_history_service import ChatHistoryService
+from ssmai_backend.services.products_service import (
+    get_all_products_with_analysis_service,
+    get_products_with_stock_service,
+)
+from ssmai_backend.services.stock_service import (
+    get_all_moviments_by_enterpryse_user_service,
+    get_all_stock_by_user_enterpryse_service,
+    get_moviments_by_product_id_user_enterpryse_service,
+)
+
+PRODUCTS_PER_ENTERPRISE = 50
+DAYS = 30
+
+current_user = SimpleNamespace(id=1, id_empresas=1)
+
+
+@pytest_asyncio.fixture
+async def seeded_session(session):
+    await session.execute(insert(Empresa), [
+        {"nome": "Empresa A", "ramo": "varejo"},
+        {"nome": "Empresa B", "ramo": "varejo"},
+    ])
+    await session.execute(insert(User), [{
+        "email": "user@ssmai.com",
+        "hashed_password": "secret",
+        "is_active": True,
+        "is_superuser": False,
+        "is_verified": True,
+        "id_empresas": 1,
+        "username": "user",
+        "name": "User",
+        "last_name": "Test",
+    }])
+    await session.execute(insert(Produto), [
+        {"id_empresas": empresa, "nome": f"Produto {i}", "categoria": "Geral"}
+        for empresa in (1, 2)
+        for i in range(PRODUCTS_PER_ENTERPRISE)
+    ])
+    product_ids = range(1, 2 * PRODUCTS_PER_ENTERPRISE + 1)
+    await session.execute(insert(Estoque), [
+        {
+            "id_produtos": product_id,
+            "id_empresas": 1 if product_id <= PRODUCTS_PER_ENTERPRISE else 2,
+            "quantidade_disponivel": 10,
+            "custo_medio": 5.0,
+        }
+        for product_id in product_ids
+    ])
+    await session.execute(
+        text("UPDATE estoque SET estoque_ideal = id_produtos % 7 + 1")
+    )
+    start = datetime(2025, 9, 1)
+    await session.execute(insert(MovimentacoesEstoque), [
+        {
+            "id_produtos": product_id,
+            "id_empresas": 1 if product_id <= PRODUCTS_PER_ENTERPRISE else 2,
+            "tipo": "Saida",
+            "quantidade": 1,
+            "preco_und": 5.0,
+            "total": 5.0,
+            "date": start + timedelta(days=day),
+        }
+        for product_id in product_ids
+        for day in range(DAYS)
+    ])
+    await session.execute(insert(Previsoes), [
+        {
+            "id_produtos": product_id,
+            "data": start + timedelta(days=day),
+            "saida_prevista": 1.0,
+        }
+        for product_id in product_ids
+        for day in range(DAYS + 15)
+    ])
+    await session.execute(insert(ChatConversation), [
+        {
+            "user_id": 1,
+            "session_id": f"session-{i}",
+            "user_message": "oi",
+            "assistant_response": "olá",
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(20)
+    ])
+    await session.commit()
+    await session.execute(text("ANALYZE"))
+    return session
+
+
+@contextmanager
+def captured_selects(session):
+    statements = []
+
+    def before_cursor_execute(**kw):
+        if kw["statement"].lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((kw["statement"], kw["parameters"]))
+
+    sync_engine = session.bind.sync_engine
+    event.listen(
+        sync_engine, "before_cursor_execute", before_cursor_execute,
+        named=True
+    )
+    yield statements
+    event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _index_conditions(plan: dict) -> list[str]:
+    conditions = [plan["Index Cond"]] if "Index Cond" in plan else []
+    for child in plan.get("Plans", []):
+        conditions += _index_conditions(child)
+    return conditions
+
+
+def _seq_scans(plan: dict) -> set[str]:
+    tables = set()
+    if plan["Node Type"] == "Seq Scan":
+        tables.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        tables |= _seq_scans(child)
+    return tables
+
+
+async def explained_plans(session, statements) -> list[dict]:
+    assert statements
+    connection = await session.connection()
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plans = []
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plans.append(result.scalar()[0]["Plan"])
+    return plans
+
+
+async def seq_scanned_tables(session, statements) -> set[str]:
+    tables = set()
+    for plan in await explained_plans(session, statements):
+        tables |= _seq_scans(plan)
+    return tables
+
+
+@pytest.mark.asyncio
+async def test_enterprise_moviments_use_indexes(seeded_session):
+    page = CursorPage(limit=20)
+    with captured_selects(seeded_session) as statements:
+        result = await get_all_moviments_by_enterpryse_user_service(
+            seeded_session, page, current_user
+        )
+        await get_all_moviments_by_enterpryse_user_service(
+            seeded_session,
+            CursorPage(cursor=result["next_cursor"], limit=20),
+            current_user,
+        )
+
+    assert not await seq_scanned_tables(seeded_session, statements)
+    # A empresa precisa liderar o índice, não virar filtro sobre a data
+    for plan in await explained_plans(seeded_session, statements):
+        assert any(
+            "id_empresas" in condition
+            for condition in _index_conditions(plan)
+        )
+
+
+@pytest.mark.asyncio
+async def test_enterprise_moviments_pages_have_no_gaps(seeded_session):
+    expected = (await seeded_session.execute(
+        select(MovimentacoesEstoque.date, MovimentacoesEstoque.id)
+        .join(Produto, MovimentacoesEstoque.id_produtos == Produto.id)
+        .where(Produto.id_empresas == current_user.id_empresas)
+        .order_by(
+            MovimentacoesEstoque.date.desc(), MovimentacoesEstoque.id.desc()
+        )
+    )).all()
+
+    seen = []
+    page = CursorPage(limit=70)
+    while True:
+        result = await get_all_moviments_by_enterpryse_user_service(
+            seeded_session, page, current_user
+        )
+        seen += [
+            (moviment.date, moviment.id) for moviment in result["products"]
+        ]
+        if result["next_cursor"] is None:
+            break
+        page = CursorPage(cursor=result["next_cursor"], limit=70)
+
+    assert len(expected) == PRODUCTS_PER_ENTERPRISE * DAYS
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_product_moviments_use_indexes(seeded_session):
+    with captured_selects(seeded_session) as statements:
+        await get_moviments_by_product_id_user_enterpryse_service(
+            1, seeded_session, CursorPage(), current_user
+        )
+
+    assert not await seq_scanned_tables(seeded_session, statements)
+
+
+@pytest.mark.asyncio
+async def test_enterprise_stock_uses_indexes(seeded_session):
+    with captured_selects(seeded_session) as statements:
+        await get_all_stock_by_user_enterpryse_service(
+            seeded_session, FilterPage(), current_user
+        )
+        await get_worst_stock_deviation_service(
+            seeded_session, current_user, FilterPage()
+        )
+
+    assert not await seq_scanned_tables(seeded_session, statements) & {
+        "estoque", "produtos"
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_analysis_uses_indexes(seeded_session):
+    with captured_selects(seeded_session) as statements:
+        await get_batch_analysis_service(current_user, seeded_session)
+
+    assert not await seq_scanned_tables(seeded_session, statements)
+
+
+@pytest.mark.asyncio
+async def test_products_with_analysis_use_indexes(seeded_session):
+    with captured_selects(seeded_session) as statements:
+        products = await get_all_products_with_analysis_service(
+            seeded_session, FilterPage(limit=20), current_user
+        )
+
+    assert [product.id for product in products] == list(range(1, 21))
+    assert not await seq_scanned_tables(seeded_session, statements) & {
+        "previsoes", "produtos"
+    }
+
+
+@pytest.mark.asyncio
+async def test_products_with_stock_use_indexes(seeded_session):
+    with captured_selects(seeded_session) as statements:
+        result = await get_products_with_stock_service(
+            seeded_session, CursorPage(limit=20), None, None, current_user
+        )
+        next_page = await get_products_with_stock_service(
+            seeded_session,
+            CursorPage(cursor=result["next_cursor"], limit=20),
+            None, None, current_user,
+        )
+
+    ids = [row.id for row in result["products"] + next_page["products"]]
+    assert ids == list(range(PRODUCTS_PER_ENTERPRISE, 10, -1))
+    assert not await seq_scanned_tables(seeded_session, statements)
+
+
+@pytest.mark.asyncio
+async def test_chat_session_lookup_uses_indexes(seeded_session):
+    with captured_selects(seeded_session) as statements:
+        await ChatHistoryService.get_or_create_active_session(
+            seeded_session, current_user
+        )
+
+    assert not await seq_scanned_tables(seeded_session, statements)
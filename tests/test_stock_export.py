@@ -0,0 +1,108 @@
+import csv
+import io
+import math
+from datetime import datetime, timedelta
+from functools import partial
+from types import SimpleNamespace
+
+import pyarrow.parquet as pq
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+
+from ssmai_backend.enums.products_enums import (
+    ExportDatasetEnum,
+    ExportFormatEnum,
+)
+from ssmai_backend.models.produto import (
+    Empresa,
+    MovimentacoesEstoque,
+    Produto,
+)
+from ssmai_backend.services import stock_export
+from ssmai_backend.services.stock_export import (
+    MOVIMENTS_COLUMNS,
+    export_stock_service,
+)
+
+current_user = SimpleNamespace(id=1, id_empresas=1)
+
+START = datetime(2025, 10, 1, 8, 30)
+OWN_MOVIMENTS = 5
+CHUNK_SIZE = 2
+IDS = list(range(1, OWN_MOVIMENTS + 1))
+
+
+@pytest_asyncio.fixture
+async def export_session(session, engine, monkeypatch):
+    monkeypatch.setattr(stock_export, "engine", engine)
+    # Partições pequenas para o stream sair em vários pedaços
+    monkeypatch.setattr(
+        stock_export,
+        "iter_export_partitions",
+        partial(stock_export.iter_export_partitions, chunk_size=CHUNK_SIZE),
+    )
+    await session.execute(insert(Empresa), [
+        {"nome": "Empresa A", "ramo": "varejo"},
+        {"nome": "Empresa B", "ramo": "varejo"},
+    ])
+    await session.execute(insert(Produto), [
+        {"id_empresas": 1, "nome": "Produto A", "categoria": "Geral"},
+        {"id_empresas": 2, "nome": "Produto B", "categoria": "Geral"},
+    ])
+    await session.execute(insert(MovimentacoesEstoque), [
+        {
+            "id_produtos": 1 if i < OWN_MOVIMENTS else 2,
+            "id_empresas": 1 if i < OWN_MOVIMENTS else 2,
+            "tipo": "Entrada" if i % 2 == 0 else "Saida",
+            "quantidade": i + 1,
+            "preco_und": 2.5,
+            "total": 2.5 * (i + 1),
+            "date": START + timedelta(days=i),
+            "updated_at": START + timedelta(days=i),
+        }
+        for i in range(OWN_MOVIMENTS + 1)
+    ])
+    await session.commit()
+    return session
+
+
+async def _export(format: ExportFormatEnum) -> list[bytes]:
+    stream, _ = export_stock_service(
+        current_user, format, ExportDatasetEnum.moviments
+    )
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_reads_back(export_session):
+    chunks = await _export(ExportFormatEnum.csv)
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert len(chunks) > 1
+    assert list(rows[0]) == list(MOVIMENTS_COLUMNS)
+    assert [int(row["id"]) for row in rows] == IDS
+    assert [row["tipo"] for row in rows[:2]] == ["entrada", "saida"]
+    assert datetime.fromisoformat(rows[-1]["date"]) == (
+        START + timedelta(days=OWN_MOVIMENTS - 1)
+    )
+
+
+@pytest.mark.asyncio
+async def test_parquet_export_reads_back(export_session):
+    chunks = await _export(ExportFormatEnum.parquet)
+
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    table = parquet_file.read()
+    assert len(chunks) > 1
+    # Um row group por partição do cursor
+    assert parquet_file.metadata.num_row_groups == math.ceil(
+        OWN_MOVIMENTS / CHUNK_SIZE
+    )
+    assert table.schema.names == list(MOVIMENTS_COLUMNS)
+    assert table.column("id").to_pylist() == IDS
+    assert table.column("quantidade").to_pylist() == IDS
+    assert table.column("tipo").to_pylist()[:2] == ["entrada", "saida"]
+    assert table.column("date").to_pylist() == [
+        START + timedelta(days=i) for i in range(OWN_MOVIMENTS)
+    ]
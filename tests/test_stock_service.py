@@ -0,0 +1,169 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, insert, select
+
+from ssmai_backend.enums.products_enums import MovementTypesEnum
+from ssmai_backend.models.produto import (
+    Empresa,
+    Estoque,
+    MovimentacoesEstoque,
+    Produto,
+)
+from ssmai_backend.schemas.stock_schemas import BatchMovimentModel
+from ssmai_backend.services.stock_service import (
+    price_moviments_chunk,
+    register_moviments_batch_service,
+)
+
+current_user = SimpleNamespace(id=1, id_empresas=1)
+
+
+@pytest_asyncio.fixture
+async def stock_session(session):
+    await session.execute(insert(Empresa), [
+        {"nome": "Empresa A", "ramo": "varejo"},
+        {"nome": "Empresa B", "ramo": "varejo"},
+    ])
+    await session.execute(insert(Produto), [
+        {"id_empresas": 1, "nome": "Produto A", "categoria": "Geral"},
+        {"id_empresas": 2, "nome": "Produto B", "categoria": "Geral"},
+    ])
+    await session.execute(insert(Estoque), [
+        {
+            "id_produtos": product_id,
+            "id_empresas": product_id,
+            "quantidade_disponivel": 10,
+            "custo_medio": 5.0,
+        }
+        for product_id in (1, 2)
+    ])
+    await session.commit()
+    return session
+
+
+def _batch_item(tipo, quantidade, preco_und=None, id_produtos=1):
+    return BatchMovimentModel(
+        id_produtos=id_produtos,
+        tipo=tipo,
+        quantidade=quantidade,
+        preco_und=preco_und,
+    )
+
+
+def test_price_moviments_chunk_replays_average_cost_per_product():
+    df_chunk = pd.DataFrame(
+        [
+            (1, "entrada", 10, 7.0),
+            (2, "saida", 2, 99.0),
+            (3, "entrada", 3, 8.0),
+            (1, "saida", 5, 99.0),
+            (2, "entrada", 2, 9.0),
+            (3, "saida", 1, 99.0),
+            (1, "entrada", 5, 4.0),
+        ],
+        columns=["id_produtos", "tipo", "quantidade", "preco_und"]
+    )
+    # Produto 3 zera o estoque numa entrada e mantém o custo anterior
+    stocks = {1: [10, 5.0], 2: [4, 3.0], 3: [-3, 2.0]}
+
+    price_moviments_chunk(df_chunk, stocks)
+
+    assert df_chunk["preco_und"].tolist() == pytest.approx(
+        [7.0, 3.0, 8.0, 6.0, 9.0, 2.0, 4.0]
+    )
+    assert df_chunk["total"].tolist() == pytest.approx(
+        [70.0, 6.0, 24.0, 30.0, 18.0, 2.0, 20.0]
+    )
+    assert stocks == {
+        1: [20, pytest.approx(5.5)],
+        2: [4, pytest.approx(6.0)],
+        3: [-1, pytest.approx(2.0)],
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_invalid_items_one_by_one(stock_session):
+    result = await register_moviments_batch_service(
+        [
+            _batch_item(MovementTypesEnum.saida, -5),
+            _batch_item(MovementTypesEnum.entrada, 0, 7.0),
+            _batch_item(MovementTypesEnum.saida, 1, id_produtos=2),
+            _batch_item(MovementTypesEnum.entrada, 3),
+            _batch_item(MovementTypesEnum.outro, 1),
+            _batch_item(MovementTypesEnum.saida, 11),
+            _batch_item(MovementTypesEnum.saida, 10),
+        ],
+        stock_session,
+        current_user,
+    )
+
+    assert [item.get("detail") for item in result["results"]] == [
+        "Quantity must be positive",
+        "Quantity must be positive",
+        "Product not found!",
+        "Entry without preco_und",
+        "Saida ou Entrada",
+        "Quantity unavailable",
+        None,
+    ]
+    # A saída negativa não somou ao estoque: só a saída de 10 coube
+    assert [
+        "moviment" in item for item in result["results"]
+    ] == [False] * 6 + [True]
+
+
+@pytest.mark.asyncio
+async def test_batch_prices_exits_with_running_average_cost(stock_session):
+    result = await register_moviments_batch_service(
+        [
+            _batch_item(MovementTypesEnum.entrada, 10, 7.0),
+            _batch_item(MovementTypesEnum.saida, 5),
+            _batch_item(MovementTypesEnum.saida, 20),
+            _batch_item(MovementTypesEnum.entrada, 5, 4.0),
+            _batch_item(MovementTypesEnum.saida, 20),
+        ],
+        stock_session,
+        current_user,
+    )
+
+    moviments = [item.get("moviment") for item in result["results"]]
+    assert moviments[2] is None
+    assert result["results"][2]["detail"] == "Quantity unavailable"
+    priced = [moviment for moviment in moviments if moviment is not None]
+    # Estoque 10 a 5.0; +10 a 7.0 -> 6.0; -5; +5 a 4.0 -> 5.5
+    assert [moviment.preco_und for moviment in priced] == pytest.approx(
+        [7.0, 6.0, 4.0, 5.5]
+    )
+    assert [moviment.total for moviment in priced] == pytest.approx(
+        [70.0, 30.0, 20.0, 110.0]
+    )
+    assert all(moviment.id_empresas == 1 for moviment in priced)
+
+
+@pytest.mark.asyncio
+async def test_deleting_product_removes_its_moviments(stock_session):
+    await register_moviments_batch_service(
+        [
+            _batch_item(MovementTypesEnum.entrada, 1, 5.0, id_produtos=1),
+            _batch_item(MovementTypesEnum.saida, 1, id_produtos=1),
+        ],
+        stock_session,
+        current_user,
+    )
+    await register_moviments_batch_service(
+        [_batch_item(MovementTypesEnum.entrada, 1, 5.0, id_produtos=2)],
+        stock_session,
+        SimpleNamespace(id=2, id_empresas=2),
+    )
+
+    await stock_session.execute(delete(Produto).where(Produto.id == 1))
+    await stock_session.commit()
+
+    remaining = await stock_session.scalars(
+        select(MovimentacoesEstoque.id_produtos)
+    )
+    # Sem FK nas movimentações, a cascata vem do trigger em produtos
+    assert remaining.all() == [2]
@@ -0,0 +1,36 @@
+import pytest
+
+from ssmai_backend.enums.products_enums import MovementTypesEnum
+from ssmai_backend.services.stock_snapshots_service import (
+    replay_moviments_backward,
+    replay_moviments_forward,
+)
+
+MOVIMENTS = [
+    (MovementTypesEnum.entrada, 10, 100.0),
+    (MovementTypesEnum.saida, 4, 40.0),
+    (MovementTypesEnum.entrada, 6, 90.0),
+    (MovementTypesEnum.outro, 1, 0.0),
+]
+
+
+def test_forward_replay_matches_moving_average():
+    assert replay_moviments_forward(0, 0.0, MOVIMENTS) == pytest.approx(
+        (12, (6 * 10 + 90) / 12)
+    )
+
+
+def test_forward_replay_keeps_cost_when_entry_zeroes_stock():
+    # Estoque negativo zerado por uma entrada não divide por zero
+    assert replay_moviments_forward(
+        -3, 7.0, [(MovementTypesEnum.entrada, 3, 30.0)]
+    ) == (0, 7.0)
+
+
+def test_backward_replay_undoes_forward_replay():
+    start = (5, 8.0)
+    end = replay_moviments_forward(*start, MOVIMENTS)
+
+    assert replay_moviments_backward(
+        *end, list(reversed(MOVIMENTS))
+    ) == pytest.approx(start)